@@ -0,0 +1,21 @@
+"""
+Benchmarks for the scraper and request paths, run from the api directory:
+
+    python -m benchmarks.<name>
+
+They run against local stand-ins (a TLS server, moto, delayed stubs) rather
+than the real registration site or AWS, and print a comparison table.
+"""
+import os
+
+# Settings are required at import; nothing here talks to real AWS
+for name, value in {
+    'AWS_REGION_NAME': 'us-east-1',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'testing',
+    'AWS_SECRET_ACCESS_KEY': 'testing',
+    'AWS_COGNITO_APP_CLIENT_ID': 'bench-client',
+    'AWS_COGNITO_USER_POOL_ID': 'us-east-1_bench',
+    'SNS_TOPIC_ARN': 'arn:aws:sns:us-east-1:123456789012:course-notifications'
+}.items():
+    os.environ.setdefault(name, value)
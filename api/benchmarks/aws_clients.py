@@ -0,0 +1,75 @@
+"""
+Per-request cost of building AWS clients versus the shared repository.
+
+Before the repository layer, each request built a DynamoDB resource, a
+Table and an SNS client from scratch. This times that against fetching
+the shared clients from get_aws(), on their own and followed by one
+GetItem, against moto.
+
+    python -m benchmarks.aws_clients [--iterations 200]
+"""
+import argparse
+import statistics
+import time
+from typing import Callable
+
+import boto3
+from moto import mock_aws
+
+from core.config import get_settings
+from repositories.aws import AWSRepository, get_aws, set_aws
+
+KEY = {'class_id': '10000-2026-Fall'}
+
+
+def per_request(read: bool):
+    settings = get_settings()
+    dynamodb = boto3.resource('dynamodb', region_name=settings.AWS_REGION_NAME)
+    table = dynamodb.Table(settings.CLASSES_TABLE_NAME)
+    boto3.client('sns', region_name=settings.AWS_REGION_NAME)
+    if read:
+        table.get_item(Key=KEY)
+
+
+def shared(read: bool):
+    aws = get_aws()
+    client = aws.dynamodb_client
+    aws.sns
+    if read:
+        client.get_item(TableName=aws.settings.CLASSES_TABLE_NAME, Key=KEY)
+
+
+def measure(request: Callable[[bool], None], read: bool, iterations: int) -> float:
+    """Median time per request in ms"""
+    request(read)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        request(read)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(iterations: int):
+    with mock_aws():
+        settings = get_settings()
+        boto3.client('dynamodb', region_name=settings.AWS_REGION_NAME).create_table(
+            TableName=settings.CLASSES_TABLE_NAME,
+            KeySchema=[{'AttributeName': 'class_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'class_id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        set_aws(AWSRepository())
+
+        print(f"{'':<24}{'clients only':>14}{'+ GetItem':>12}")
+        for name, request in (('built per request', per_request), ('shared (get_aws)', shared)):
+            print(f"{name:<24}{measure(request, False, iterations):>12.2f}ms{measure(request, True, iterations):>10.2f}ms")
+
+        set_aws(None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    arguments = parser.parse_args()
+    main(arguments.iterations)
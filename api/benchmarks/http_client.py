@@ -0,0 +1,119 @@
+"""
+Per-check latency of a client per check versus the shared pooled client.
+
+A local HTTPS server with a self-signed certificate stands in for the
+registration site, so every new client pays a real TCP connect and TLS
+handshake. Needs the openssl command line tool.
+
+    python -m benchmarks.http_client [--requests 300]
+"""
+import argparse
+import asyncio
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Awaitable, Callable, Tuple
+
+import httpx
+
+PAGE = (
+    b'<table>'
+    + b''.join(b'<tr id="row-%d"><td class="status">Open</td><td class="seats">5</td></tr>' % (10000 + i) for i in range(300))
+    + b'</table>'
+)
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(directory: str) -> str:
+    """Start the HTTPS stand-in and return its URL; the CA is trusted through SSL_CERT_FILE"""
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        [
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+            '-keyout', key, '-out', cert, '-subj', '/CN=localhost',
+            '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
+        ],
+        check=True,
+        capture_output=True
+    )
+    os.environ['SSL_CERT_FILE'] = cert
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ListingHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"https://localhost:{server.server_address[1]}/courses?term=202630"
+
+
+async def measure(fetch: Callable[[], Awaitable[httpx.Response]], requests: int, concurrency: int) -> Tuple[float, float, float]:
+    """p50 and p99 latency in ms and checks per second"""
+    for _ in range(5):
+        await fetch()
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await fetch()
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], requests / elapsed
+
+
+async def main(requests: int):
+    from core.http_client import close_http_client, get_http_client
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = start_server(directory)
+
+        async def client_per_check():
+            # What the scraper did before the shared client
+            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+                return await client.get(url)
+
+        async def shared_client():
+            return await get_http_client().get(url)
+
+        print(f"{'':<34}{'p50':>10}{'p99':>10}{'checks/s':>10}")
+        for concurrency in (1, 10):
+            for name, fetch in (('client per check', client_per_check), ('shared client', shared_client)):
+                p50, p99, rate = await measure(fetch, requests, concurrency)
+                print(f"{f'concurrency {concurrency:>2}  {name}':<34}{p50:>8.1f}ms{p99:>8.1f}ms{rate:>10.0f}")
+
+        await close_http_client()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,108 @@
+"""
+Latency of GET / while signins wait on a slow AWS backend.
+
+Serves the app with uvicorn and replaces Cognito with a stand-in whose
+calls sleep for the configured delay. For each delay the client sends
+10 signins/s and 200 GET / requests/s for `--duration` seconds and
+reports GET / latency. With --inline the AWS calls run on the event loop,
+as they did before run_aws, for the "before" numbers.
+
+    python -m benchmarks.load [--delays 0 0.2 1.0] [--duration 2] [--inline]
+"""
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from typing import List
+
+import httpx
+import uvicorn
+
+from core.dependencies import get_aws_cognito
+from main import app
+
+SIGNIN = {'email': 'student@example.edu', 'password': 'password1'}
+
+
+class SlowCognito:
+    """Cognito stand-in whose calls block their thread for `delay` seconds"""
+
+    delay = 0.0
+
+    def user_signin(self, data):
+        time.sleep(self.delay)
+        return {
+            'AuthenticationResult': {'AccessToken': 'a', 'RefreshToken': 'r', 'IdToken': 'i', 'ExpiresIn': 3600},
+            'ResponseMetadata': {'HTTPStatusCode': 200}
+        }
+
+
+def serve() -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=0, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def percentile(latencies: List[float], q: float) -> float:
+    return latencies[int(q * (len(latencies) - 1))] * 1000
+
+
+async def drive(base_url: str, duration: float) -> List[float]:
+    limits = httpx.Limits(max_connections=500, max_keepalive_connections=500)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        latencies = []
+
+        async def fast():
+            start = time.perf_counter()
+            response = await client.get('/')
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+        async def signin():
+            (await client.post('/auth/signin', json=SIGNIN)).raise_for_status()
+
+        tasks = []
+        for tick in range(int(duration / 0.05)):
+            if tick % 2 == 0:
+                tasks.append(asyncio.ensure_future(signin()))
+            tasks += [asyncio.ensure_future(fast()) for _ in range(10)]
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*tasks)
+
+    return sorted(latencies)
+
+
+def main(delays: List[float], duration: float, inline: bool):
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    cognito = SlowCognito()
+    app.dependency_overrides[get_aws_cognito] = lambda: cognito
+    if inline:
+        import routes.auth
+
+        async def run_inline(func, *args, **kwargs):
+            return func(*args, **kwargs)
+        routes.auth.run_aws = run_inline
+
+    server = serve()
+    host, port = server.servers[0].sockets[0].getsockname()[:2]
+
+    print(f"GET / latency, AWS calls {'on the event loop' if inline else 'through run_aws'}")
+    print(f"{'backend delay':<16}{'p50':>10}{'p99':>10}")
+    for delay in delays:
+        cognito.delay = delay
+        latencies = asyncio.run(drive(f"http://{host}:{port}", duration))
+        print(f"{f'{delay:g}s':<16}{percentile(latencies, 0.5):>8.0f}ms{percentile(latencies, 0.99):>8.0f}ms")
+
+    server.should_exit = True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--delays', type=float, nargs='+', default=[0.0, 0.2, 1.0])
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--inline', action='store_true')
+    arguments = parser.parse_args()
+    main(arguments.delays, arguments.duration, arguments.inline)
@@ -0,0 +1,86 @@
+"""
+Parse time and peak memory of the listing parsers on the saved fixture page.
+
+Compares the original per-CRN approach (a full BeautifulSoup tree per
+response, then a regex find over every row for each CRN) with the soup and
+fast parsers, for one CRN, a tenth of the page's CRNs and all of them.
+
+    python -m benchmarks.parsers [--page tests/fixtures/listing.html] [--repeat 20]
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from services.parsers import CourseListingParser, FastListingParser, SoupListingParser
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'listing.html')
+
+
+def original(page: str, crns: List[str]) -> Dict[str, Dict[str, Any]]:
+    """The scraper before the parser layer: one tree and one regex find per CRN"""
+    results = {}
+    for crn in crns:
+        soup = BeautifulSoup(page, 'html.parser')
+        course_row = soup.find('tr', {'id': re.compile(f'.*{crn}.*')})
+        if course_row:
+            status_cell = course_row.find('td', {'class': 'status'})
+            seats_cell = course_row.find('td', {'class': 'seats'})
+            results[crn] = CourseListingParser.availability(
+                status_cell.text if status_cell else None,
+                seats_cell.text if seats_cell else None
+            )
+    return results
+
+
+def measure(parse: Callable[[str, List[str]], Any], page: str, crns: List[str], repeat: int):
+    """Median parse time in ms and peak traced memory in KiB"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(page, crns)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    parse(page, crns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 1024
+
+
+def main(page_path: str, repeat: int):
+    with open(page_path) as f:
+        page = f.read()
+    crns = sorted(set(re.findall(r'<tr\b[^>]*\bid="row-(\d+)', page)))
+
+    parsers = {
+        'original': original,
+        'soup': SoupListingParser().parse,
+        'fast': FastListingParser().parse
+    }
+    print(f"{os.path.basename(page_path)}: {len(page) / 1024:.0f} KiB, {len(crns)} rows")
+    print(f"{'':<22}{'median':>12}{'peak memory':>14}")
+    for label, wanted in (('1 CRN', crns[len(crns) // 2:len(crns) // 2 + 1]), ('10% of CRNs', crns[::10]), ('all CRNs', crns)):
+        for name, parse in parsers.items():
+            if name == 'original' and len(wanted) > 50:
+                # One tree per CRN: minutes for a whole page, growing linearly
+                print(f"{f'{label:<12}{name}':<22}{'skipped':>12}")
+                continue
+            # The original approach rebuilds the tree per CRN; keep its runs short
+            runs = repeat if name != 'original' or len(wanted) == 1 else 1
+            median, peak = measure(parse, page, wanted, runs)
+            print(f"{f'{label:<12}{name}':<22}{median:>10.2f}ms{peak:>11.0f}KiB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page', default=FIXTURE)
+    parser.add_argument('--repeat', type=int, default=20)
+    arguments = parser.parse_args()
+    main(arguments.page, arguments.repeat)
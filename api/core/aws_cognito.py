@@ -1,9 +1,12 @@
+import asyncio
 import os
-import boto3
 import logging
+import time
+from typing import Optional
 from pydantic import EmailStr
 
 
+from repositories.aws import get_aws, run_aws
 from schemas.auth import ChangePassword, ConfirmForgotPassword, UserSignin, UserSignup, UserVerify, PhoneVerify
 
 
@@ -29,15 +32,30 @@ if missing_vars:
 
 class AWS_Cognito:
     def __init__(self):
+        # The client is shared process-wide and connects on first use, so
+        # building this is cheap and makes no network calls
+        logger.info(f"Initializing AWS Cognito client with region: {AWS_REGION_NAME}")
+        self.client = get_aws().cognito
+        self.healthy: Optional[bool] = None
+        self.last_health_check: Optional[float] = None
+        self.last_health_error: Optional[str] = None
+
+    def health_check(self) -> bool:
+        """Check the user pool can be reached; records the result instead of raising"""
         try:
-            logger.info(f"Initializing AWS Cognito client with region: {AWS_REGION_NAME}")
-            self.client = boto3.client("cognito-idp", region_name=AWS_REGION_NAME)
-            # Test the client connection
-            self.client.list_user_pools(MaxResults=1)
-            logger.info("Successfully initialized AWS Cognito client")
+            self.client.describe_user_pool(UserPoolId=AWS_COGNITO_USER_POOL_ID)
         except Exception as e:
-            logger.error(f"Failed to initialize AWS Cognito client: {str(e)}")
-            raise
+            if self.healthy is not False:
+                logger.warning(f"Cognito health check failed: {str(e)}")
+            self.healthy = False
+            self.last_health_error = str(e)
+        else:
+            if self.healthy is False:
+                logger.info("Cognito health check recovered")
+            self.healthy = True
+            self.last_health_error = None
+        self.last_health_check = time.time()
+        return self.healthy
 
     def user_signup(self, user: UserSignup):
         try:
@@ -92,6 +110,18 @@ class AWS_Cognito:
 
         return response
 
+    def find_username(self, attribute: str, value: str):
+        """Username of the user whose `attribute` (e.g. email) equals `value`, if any"""
+        escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+        response = self.client.list_users(
+            UserPoolId=AWS_COGNITO_USER_POOL_ID,
+            Filter=f'{attribute} = "{escaped}"',
+            Limit=1
+        )
+
+        users = response.get('Users', [])
+        return users[0]['Username'] if users else None
+
     def user_signin(self, data: UserSignin):
         response = self.client.initiate_auth(
             ClientId=AWS_COGNITO_APP_CLIENT_ID,
@@ -214,4 +244,11 @@ class AWS_Cognito:
             return response
         except Exception as e:
             logger.error(f"Failed to get user info from token: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+async def run_health_checks(cognito: AWS_Cognito, interval: float):
+    """Check Cognito every `interval` seconds until cancelled, off the request path"""
+    while True:
+        await run_aws(cognito.health_check)
+        await asyncio.sleep(interval)
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded least-recently-used cache that keeps hit and miss counts"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, maxsize)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value without counting it as a hit or miss"""
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        self._entries.clear()
+
+    def record_hit(self, count: int = 1):
+        self.hits += count
+
+    def record_miss(self, count: int = 1):
+        self.misses += count
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries also expire after a fixed time-to-live"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        super().__init__(maxsize)
+        self.ttl = ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self.pop(key)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        super().set(key, (time.monotonic() + ttl, value))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), 'ttl_seconds': self.ttl}
+
+
+class SingleFlight:
+    """
+    Collapses concurrent loads of the same key into one.
+
+    The first caller for a key runs the loader; callers that arrive while it
+    is still running wait for and share its result (or its exception).
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+
+        future = self._in_flight.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        # Nobody may be waiting on the result; don't warn about an unretrieved exception
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[key] = future
+        self.leaders += 1
+
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.set_exception(RuntimeError(f"Shared load for {key!r} was cancelled"))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': len(self._in_flight),
+            'leaders': self.leaders,
+            'shared': self.shared
+        }
+
+
+class SingleFlightCache:
+    """TTL/LRU cache in front of a SingleFlight, so a burst of lookups costs one load"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.flight = SingleFlight()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.cache.record_hit()
+            return value
+
+        self.cache.record_miss()
+
+        async def load():
+            loaded = await loader()
+            if cacheable(loaded):
+                self.cache.set(key, loaded)
+            return loaded
+
+        return await self.flight.do(key, load)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.cache.get(key, default)
+
+    def set(self, key: Hashable, value: Any):
+        self.cache.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), **self.flight.stats()}
@@ -0,0 +1,135 @@
+import logging
+import time
+from typing import Any, Dict
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream host whose circuit is open"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single upstream host.
+
+    CLOSED: calls go through; `failure_threshold` consecutive failures open it.
+    OPEN: calls fail immediately until `recovery_timeout` has passed.
+    HALF_OPEN: up to `half_open_max_calls` probe calls at a time go through;
+    `success_threshold` successful probes close it, any failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 2,
+    ):
+        self.host = host
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.success_threshold = max(1, success_threshold)
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_successes = 0
+        self._probes_in_flight = 0
+        self._opened_at = 0.0
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    def before_call(self):
+        """Reserve permission to call the host, or raise CircuitOpenError"""
+        if self.state == self.OPEN:
+            retry_in = self._opened_at + self.recovery_timeout - time.monotonic()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.host, retry_in)
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.host, 0)
+            self._probes_in_flight += 1
+
+    def on_success(self):
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.success_threshold:
+                self._transition(self.CLOSED)
+        else:
+            self._failures = 0
+
+    def on_failure(self):
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._transition(self.OPEN)
+            return
+
+        self._failures += 1
+        if self.state == self.CLOSED and self._failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        logger.warning(f"Circuit for {self.host}: {self.state} -> {state}")
+        self.state = state
+        self._failures = 0
+        self._probe_successes = 0
+        self._probes_in_flight = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+        return {
+            'host': self.host,
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'times_opened': self.times_opened,
+            'rejected': self.rejected,
+            'retry_in_seconds': round(retry_in, 3)
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """Return the breaker shared by every request to `host`"""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        settings = get_settings()
+        breaker = CircuitBreaker(
+            host,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=settings.CIRCUIT_RECOVERY_SECONDS,
+            half_open_max_calls=settings.CIRCUIT_HALF_OPEN_MAX_CALLS,
+            success_threshold=settings.CIRCUIT_SUCCESS_THRESHOLD
+        )
+        _breakers[host] = breaker
+    return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {host: breaker.stats() for host, breaker in _breakers.items()}
@@ -1,8 +1,19 @@
 import os
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
+class TermWindow(BaseModel):
+    """Registration window of one academic term"""
+    semester: str
+    year: int
+    registration_opens: date
+    registration_closes: date
+
+
 class Settings(BaseSettings):
     AWS_REGION_NAME: str
     AWS_COGNITO_APP_CLIENT_ID: str
@@ -11,6 +22,83 @@ class Settings(BaseSettings):
     USERS_TABLE_NAME: str = "Course-Users"
     USER_COURSES_TABLE_NAME: str = "Course-UserCourses"
     SNS_TOPIC_ARN: str = None
+    NOTIFICATION_LEDGER_TABLE_NAME: str = "Course-NotificationLedger"
+    # PublishBatch requests in flight at once when sending notifications
+    SNS_PUBLISH_CONCURRENCY: int = 10
+    # Ledger entries stop notifications being sent twice for the same opening
+    NOTIFICATION_LEDGER_TTL_DAYS: int = 14
+    NOTIFICATION_LEDGER_CONCURRENCY: int = 25
+    # Notify runs that try to send a notification before it's given up on
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    # Threads running blocking boto3 calls at once, so slow AWS calls can't
+    # tie up the event loop or every worker thread
+    AWS_THREAD_POOL_SIZE: int = 32
+    # Seconds between background Cognito health checks; 0 turns them off
+    COGNITO_HEALTH_CHECK_INTERVAL_SECONDS: float = 0
+    # Verified access tokens remembered until they expire
+    TOKEN_CACHE_SIZE: int = 10000
+    # Signing keys for access tokens; defaults to the user pool's JWKS URL.
+    # Keys older than JWKS_REFRESH_SECONDS are refreshed in the background,
+    # and no fetch starts within JWKS_MIN_FETCH_INTERVAL_SECONDS of the last
+    COGNITO_JWKS_URL: Optional[str] = None
+    JWKS_REFRESH_SECONDS: float = 300.0
+    JWKS_FETCH_TIMEOUT_SECONDS: float = 5.0
+    JWKS_MIN_FETCH_INTERVAL_SECONDS: float = 30.0
+
+    # Course check engine
+    CHECK_CONCURRENCY: int = 20
+    CHECK_TIMEOUT_SECONDS: float = 45.0
+    CLASSES_SCAN_SEGMENTS: int = 4
+    CLASSES_SCAN_PAGE_SIZE: Optional[int] = None
+    # How often last_checked is refreshed for classes whose status hasn't changed
+    CLASS_HEARTBEAT_SECONDS: int = 900
+
+    # Adaptive polling: each class is checked on its own interval, scaled
+    # from the base by watchers, recent changes, registration dates and seat
+    # volatility. A run checks at most SCHEDULER_BUDGET_PER_RUN due classes
+    # (0 for no limit).
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_BASE_INTERVAL_SECONDS: float = 180.0
+    SCHEDULER_MIN_INTERVAL_SECONDS: float = 60.0
+    SCHEDULER_MAX_INTERVAL_SECONDS: float = 21600.0
+    SCHEDULER_BUDGET_PER_RUN: int = 500
+
+    # Term calendar, as a JSON list of TermWindow objects. Only terms whose
+    # registration is open are checked; when empty every class is scanned.
+    TERM_CALENDAR: List[TermWindow] = []
+    # How long classes are kept after their term's registration closes
+    TERM_RETENTION_DAYS: int = 30
+
+    # Scraper HTTP client
+    SCRAPER_SIMULATE: bool = True
+    SCRAPER_BASE_URL: str = "https://example-university.edu/courses"
+    SCRAPER_PARSER: str = "fast"
+    SCRAPER_PAGE_CACHE_SIZE: int = 256
+
+    # Per-host adaptive rate limiting (requests per second)
+    SCRAPER_RATE_INITIAL: float = 5.0
+    SCRAPER_RATE_MIN: float = 0.2
+    SCRAPER_RATE_MAX: float = 20.0
+    SCRAPER_RATE_BURST: int = 5
+    SCRAPER_RATE_INCREASE: float = 0.1
+    SCRAPER_RATE_DECREASE_FACTOR: float = 0.5
+    SCRAPER_MAX_RETRIES: int = 2
+    SCRAPER_BACKOFF_BASE_SECONDS: float = 1.0
+
+    # Per-host circuit breaker around the registration system
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_SECONDS: float = 60.0
+    CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    CIRCUIT_SUCCESS_THRESHOLD: int = 2
+
+    # Short-lived availability cache shared by concurrent lookups
+    AVAILABILITY_CACHE_TTL_SECONDS: float = 60.0
+    AVAILABILITY_CACHE_SIZE: int = 5000
+    SCRAPER_TIMEOUT_SECONDS: float = 30.0
+    SCRAPER_HTTP2: bool = False
+    SCRAPER_MAX_CONNECTIONS: int = 50
+    SCRAPER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SCRAPER_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
 
 
 @lru_cache
@@ -4,11 +4,17 @@ import boto3
 import jose
 from jose import jwt
 from jose.utils import base64url_decode
-import json
+import hashlib
+import threading
 import time
 import logging
+from functools import lru_cache
+from typing import Any, Dict
 
-from core.aws_cognito import AWS_Cognito, AWS_COGNITO_USER_POOL_ID, AWS_REGION_NAME
+from core.aws_cognito import AWS_Cognito
+from core.cache import TTLCache
+from core.config import get_settings
+from core.jwks import JWKSError, JWKSManager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,41 +22,76 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
+@lru_cache()
 def get_aws_cognito():
+    """The shared Cognito wrapper, created on first use"""
     return AWS_Cognito()
 
 
-_jwks_cache = None
-_jwks_cache_timestamp = 0
-_JWKS_CACHE_TIMEOUT = 300 
+# Claims of tokens that already passed verification, keyed by the token's
+# SHA-256 digest and kept until the token expires. get_current_user runs in
+# worker threads, so the cache is guarded by a lock.
+_token_cache = TTLCache(maxsize=get_settings().TOKEN_CACHE_SIZE)
+_token_cache_lock = threading.Lock()
+# Bumped whenever the signing keys change, so a verification that raced a
+# rotation doesn't cache claims checked against the old keys
+_token_cache_generation = 0
+_verifications = 0
+_verification_seconds = 0.0
+
+
+def invalidate_token_cache():
+    """Forget every verified token, e.g. because the signing keys rotated"""
+    global _token_cache_generation
+    with _token_cache_lock:
+        _token_cache.clear()
+        _token_cache_generation += 1
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    with _token_cache_lock:
+        stats = _token_cache.stats()
+        # Entries live until their token's exp, not for a fixed TTL
+        stats.pop('ttl_seconds', None)
+        stats['verifications'] = _verifications
+        stats['avg_verification_ms'] = (
+            round(_verification_seconds / _verifications * 1000, 3) if _verifications else None
+        )
+    return stats
 
-def get_cognito_jwks():
-    global _jwks_cache, _jwks_cache_timestamp
-    current_time = time.time()
-    
-    if _jwks_cache is None or (current_time - _jwks_cache_timestamp) > _JWKS_CACHE_TIMEOUT:
-        logger.info("Refreshing Cognito JWKS cache")
-        keys_url = f'https://cognito-idp.{AWS_REGION_NAME}.amazonaws.com/{AWS_COGNITO_USER_POOL_ID}/.well-known/jwks.json'
-        
-        try:
-            import urllib.request
-            with urllib.request.urlopen(keys_url) as f:
-                response = f.read().decode('utf-8')
-            _jwks_cache = json.loads(response)
-            _jwks_cache_timestamp = current_time
-        except Exception as e:
-            logger.error(f"Failed to fetch JWKS: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error fetching authentication information"
-            )
-    
-    return _jwks_cache
+
+@lru_cache()
+def get_jwks_manager() -> JWKSManager:
+    """Cognito's signing keys, loaded on first use and kept fresh in the background"""
+    return JWKSManager.from_settings(on_rotate=invalidate_token_cache)
 
 def verify_token(token):
-    # Get the JWKS from AWS Cognito
-    jwks = get_cognito_jwks()
+    """Claims of a valid token, from the cache when it has been verified before"""
+    global _verifications, _verification_seconds
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    with _token_cache_lock:
+        payload = _token_cache.get(digest)
+        if payload is not None:
+            _token_cache.record_hit()
+            return payload
+        _token_cache.record_miss()
+        generation = _token_cache_generation
+    
+    start = time.perf_counter()
+    try:
+        payload = _decode_token(token)
+    finally:
+        with _token_cache_lock:
+            _verifications += 1
+            _verification_seconds += time.perf_counter() - start
     
+    ttl = payload.get('exp', 0) - time.time()
+    with _token_cache_lock:
+        if ttl > 0 and generation == _token_cache_generation:
+            _token_cache.set(digest, payload, ttl=ttl)
+    return payload
+
+def _decode_token(token):
     # Get the header from the token
     try:
         header = jwt.get_unverified_header(token)
@@ -60,19 +101,16 @@ def verify_token(token):
             detail="Invalid token header"
         )
     
-    rsa_key = {}
-    for key in jwks['keys']:
-        if key['kid'] == header['kid']:
-            rsa_key = {
-                'kty': key['kty'],
-                'kid': key['kid'],
-                'use': key['use'],
-                'n': key['n'],
-                'e': key['e']
-            }
-            break
+    try:
+        key = get_jwks_manager().get_key(header.get('kid'))
+    except JWKSError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching authentication information"
+        )
     
-    if not rsa_key:
+    if key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unable to find appropriate key"
@@ -81,7 +119,7 @@ def verify_token(token):
     try:
         payload = jwt.decode(
             token,
-            rsa_key,
+            key,
             algorithms=['RS256'],
             audience=None,
             options={
@@ -0,0 +1,94 @@
+import asyncio
+import base64
+import json
+import logging
+import random
+from typing import Any, Dict, Iterable, List, Optional
+
+from repositories.aws import run_aws
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB's limit on keys per BatchGetItem request
+BATCH_GET_MAX_KEYS = 100
+
+
+async def batch_get_items(
+    client,
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    projection: Optional[str] = None,
+    attribute_names: Optional[Dict[str, str]] = None,
+    max_retries: int = 5,
+    base_delay: float = 0.05,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch many items by key with BatchGetItem.
+
+    Keys are split into chunks of 100 that are fetched concurrently off the
+    event loop through the shared, thread-safe `client`. UnprocessedKeys are retried with jittered exponential backoff.
+    Items come back in no particular order; keys that don't exist are skipped.
+    """
+    async def fetch_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        request = {'Keys': chunk}
+        if projection:
+            request['ProjectionExpression'] = projection
+        if attribute_names:
+            request['ExpressionAttributeNames'] = attribute_names
+
+        items = []
+        attempt = 0
+        while True:
+            response = await run_aws(client.batch_get_item, RequestItems={table_name: request})
+            items.extend(response.get('Responses', {}).get(table_name, []))
+
+            unprocessed = response.get('UnprocessedKeys', {}).get(table_name)
+            if not unprocessed:
+                return items
+
+            if attempt >= max_retries:
+                logger.error(f"Giving up on {len(unprocessed['Keys'])} unprocessed keys from {table_name}")
+                return items
+
+            await asyncio.sleep(base_delay * (2 ** attempt) * (0.5 + random.random() / 2))
+            request = unprocessed
+            attempt += 1
+
+    chunks = [keys[i:i + BATCH_GET_MAX_KEYS] for i in range(0, len(keys), BATCH_GET_MAX_KEYS)]
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+    return [item for chunk_items in results for item in chunk_items]
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Turn a LastEvaluatedKey into an opaque pagination cursor"""
+    if not last_evaluated_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key, default=str).encode()).decode()
+
+
+def decode_cursor(
+    cursor: str,
+    key_attributes: Iterable[str],
+    expected: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Turn a pagination cursor back into an ExclusiveStartKey.
+
+    The key must have exactly `key_attributes`, all strings, and any in
+    `expected` must have those values, so a cursor can't start a read in
+    someone else's partition. Raises ValueError otherwise or if malformed.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+    if not isinstance(key, dict) or set(key) != set(key_attributes):
+        raise ValueError("Invalid pagination cursor")
+    if not all(isinstance(value, str) for value in key.values()):
+        raise ValueError("Invalid pagination cursor")
+    for name, value in (expected or {}).items():
+        if key[name] != value:
+            raise ValueError("Invalid pagination cursor")
+    return key
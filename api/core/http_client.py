@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_client() -> httpx.AsyncClient:
+    settings = get_settings()
+
+    http2 = settings.SCRAPER_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("SCRAPER_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.SCRAPER_KEEPALIVE_EXPIRY_SECONDS
+    )
+
+    logger.info(f"Creating shared scraper HTTP client (http2={http2}, max_connections={limits.max_connections})")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=settings.SCRAPER_TIMEOUT_SECONDS,
+        follow_redirects=True
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP client used for scraping.
+
+    The client is created lazily and reused for the life of the process (or
+    Lambda container) so connections to the registration host stay alive
+    between checks. It is rebuilt if the event loop it was created on is gone.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop or _client_loop.is_closed():
+        _client = _build_client()
+        _client_loop = loop
+
+    return _client
+
+
+async def close_http_client():
+    """Close the shared HTTP client, if one was created on the current loop"""
+    global _client, _client_loop
+
+    client, client_loop = _client, _client_loop
+    _client, _client_loop = None, None
+
+    if client is None or client.is_closed:
+        return
+
+    if client_loop is asyncio.get_running_loop():
+        await client.aclose()
+        logger.info("Closed shared scraper HTTP client")
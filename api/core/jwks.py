@@ -0,0 +1,172 @@
+import json
+import logging
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Dict, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSError(Exception):
+    """Raised when no signing keys have been loaded and fetching them failed"""
+
+
+class JWKSManager:
+    """
+    A JSON Web Key Set, parsed once and indexed by key id.
+
+    Keys are served from memory. Once they are older than `refresh_interval`
+    a background thread refetches them while requests keep using the current
+    set, and if that refresh fails the current keys stay in use. A token
+    signed with an unknown kid triggers an on-demand fetch in case the keys
+    rotated early. Fetches are single-flight: callers that arrive while one
+    is running wait for it instead of starting their own, and none starts
+    within `min_fetch_interval` of the last attempt, so tokens with made-up
+    kids or an unreachable endpoint can't turn into a fetch per request.
+
+    Only when no keys have ever been loaded does a failed fetch reach the
+    caller, as a JWKSError.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = 300.0,
+        timeout: float = 5.0,
+        min_fetch_interval: float = 30.0,
+        on_rotate: Optional[Callable[[], None]] = None,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.min_fetch_interval = min_fetch_interval
+        self.on_rotate = on_rotate
+
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._attempts = 0
+        self._fetch_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+        self.fetches = 0
+        self.fetch_failures = 0
+        self.background_refreshes = 0
+        self.unknown_kid_lookups = 0
+        self.rotations = 0
+
+    @classmethod
+    def from_settings(cls, on_rotate: Optional[Callable[[], None]] = None) -> 'JWKSManager':
+        settings = get_settings()
+        url = settings.COGNITO_JWKS_URL or (
+            f"https://cognito-idp.{settings.AWS_REGION_NAME}.amazonaws.com/"
+            f"{settings.AWS_COGNITO_USER_POOL_ID}/.well-known/jwks.json"
+        )
+        return cls(
+            url,
+            refresh_interval=settings.JWKS_REFRESH_SECONDS,
+            timeout=settings.JWKS_FETCH_TIMEOUT_SECONDS,
+            min_fetch_interval=settings.JWKS_MIN_FETCH_INTERVAL_SECONDS,
+            on_rotate=on_rotate
+        )
+
+    def get_key(self, kid: Optional[str]) -> Optional[Key]:
+        """The parsed public key for `kid`, or None if the key set doesn't have it"""
+        if not self._keys:
+            if self._may_fetch() or self._fetch_lock.locked():
+                self._fetch_once()
+            if not self._keys:
+                raise JWKSError(f"No signing keys could be loaded from {self.url}")
+        elif self._is_stale():
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and kid and (self._may_fetch() or self._fetch_lock.locked()):
+            # A fetch already running may bring the key; wait for it either way
+            self.unknown_kid_lookups += 1
+            logger.info(f"Unknown signing key {kid}, refetching keys")
+            self._fetch_once()
+            key = self._keys.get(kid)
+        return key
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'keys': len(self._keys),
+            'age_seconds': round(time.monotonic() - self._fetched_at, 1) if self._fetched_at is not None else None,
+            'fetches': self.fetches,
+            'fetch_failures': self.fetch_failures,
+            'background_refreshes': self.background_refreshes,
+            'unknown_kid_lookups': self.unknown_kid_lookups,
+            'rotations': self.rotations
+        }
+
+    def _is_stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self.refresh_interval
+
+    def _may_fetch(self) -> bool:
+        return self._last_attempt is None or time.monotonic() - self._last_attempt >= self.min_fetch_interval
+
+    def _refresh_in_background(self):
+        if self._refreshing or not self._may_fetch():
+            return
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.background_refreshes += 1
+                self._fetch_once()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name='jwks-refresh', daemon=True).start()
+
+    def _fetch_once(self):
+        """Fetch the keys, or wait for a fetch that is already running and use its result"""
+        attempts = self._attempts
+        with self._fetch_lock:
+            if self._attempts != attempts:
+                # Another thread fetched while this one waited
+                return
+            try:
+                self._fetch()
+            finally:
+                self._attempts += 1
+
+    def _fetch(self):
+        self._last_attempt = time.monotonic()
+        self.fetches += 1
+        logger.info(f"Fetching signing keys from {self.url}")
+        try:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                jwks = json.loads(response.read().decode('utf-8'))
+            keys = {
+                key['kid']: jwk.construct(key, key.get('alg', 'RS256'))
+                for key in jwks['keys']
+                if key.get('kid')
+            }
+        except Exception as e:
+            self.fetch_failures += 1
+            if self._keys:
+                logger.warning(f"Failed to refresh signing keys, keeping the current ones: {str(e)}")
+            else:
+                logger.error(f"Failed to fetch signing keys: {str(e)}")
+            return
+
+        rotated = bool(self._keys) and set(keys) != set(self._keys)
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        if rotated:
+            self.rotations += 1
+            logger.info("Signing keys rotated")
+            if self.on_rotate is not None:
+                self.on_rotate()
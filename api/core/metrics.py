@@ -0,0 +1,78 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CycleMetrics:
+    """Counters and timings collected over one check-and-notify cycle"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+
+    def incr(self, name: str, count: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + count
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'timings_ms': {name: round(seconds * 1000, 1) for name, seconds in sorted(self.timings.items())},
+            'elapsed_ms': round((time.perf_counter() - self.started_at) * 1000, 1)
+        }
+
+
+_current_cycle: ContextVar[Optional[CycleMetrics]] = ContextVar('current_cycle', default=None)
+
+
+def start_cycle() -> CycleMetrics:
+    """Start collecting metrics for the current task and everything it spawns"""
+    cycle = CycleMetrics()
+    _current_cycle.set(cycle)
+    return cycle
+
+
+def current_cycle() -> Optional[CycleMetrics]:
+    return _current_cycle.get()
+
+
+def incr(name: str, count: int = 1):
+    """Count towards the active cycle, if there is one"""
+    cycle = _current_cycle.get()
+    if cycle is not None:
+        cycle.incr(name, count)
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Time a block towards the active cycle, if there is one"""
+    cycle = _current_cycle.get()
+    if cycle is None:
+        yield
+        return
+    with cycle.timer(name):
+        yield
+
+
+def _count_aws_call(model, **kwargs):
+    service = model.service_model.endpoint_prefix
+    incr(f"{service}_calls")
+    incr(f"{service}.{model.name}")
+
+
+def instrument_client(client):
+    """Count every API call a boto3 client makes towards the active cycle"""
+    client.meta.events.register('before-call', _count_aws_call, unique_id='cycle-metrics-call-counter')
+    return client
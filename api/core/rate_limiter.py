@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket for a single upstream host whose rate adapts with AIMD.
+
+    Every successful response raises the rate by a fixed step, and every
+    throttling response (429/503) multiplies it down. A Retry-After from the
+    host blocks all callers until it has passed. Requests are scheduled on a
+    virtual timeline rather than behind a lock, so the limiter is safe to
+    share between concurrent checks on any event loop.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: int = 1,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+    ):
+        self.host = host
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        self.requests = 0
+        self.successes = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    async def acquire(self):
+        """Wait until the host may receive another request"""
+        self.requests += 1
+
+        while True:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+
+            earliest = max(now, self._blocked_until)
+            slot = max(self._next_slot, earliest - (self.burst - 1) * interval)
+            start = max(slot, earliest)
+            self._next_slot = slot + interval
+
+            wait = start - now
+            if wait > 0:
+                self.total_wait += wait
+                await asyncio.sleep(wait)
+
+            # A Retry-After may have arrived while we were waiting for our slot
+            if time.monotonic() >= self._blocked_until:
+                return
+
+    def on_success(self):
+        """Additive increase after a response the host was happy with"""
+        self.successes += 1
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease after a 429/503, honouring Retry-After"""
+        now = time.monotonic()
+        self.throttled += 1
+
+        # Responses to requests already in flight report the same overload,
+        # so only back off once per interval
+        if now - self._last_decrease >= max(1.0, 1.0 / self.rate):
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._last_decrease = now
+            logger.warning(f"Throttled by {self.host}, reducing rate to {self.rate:.2f} req/s")
+
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+        # Drop any burst credit so the reduced rate applies immediately
+        self._next_slot = max(self._next_slot, now + 1.0 / self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'host': self.host,
+            'rate': round(self.rate, 3),
+            'min_rate': self.min_rate,
+            'max_rate': self.max_rate,
+            'burst': self.burst,
+            'requests': self.requests,
+            'successes': self.successes,
+            'throttled': self.throttled,
+            'total_wait_seconds': round(self.total_wait, 3),
+            'blocked_for_seconds': round(max(0.0, self._blocked_until - time.monotonic()), 3)
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Read a Retry-After header given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(host: str) -> AdaptiveRateLimiter:
+    """Return the limiter shared by every request to `host`"""
+    limiter = _limiters.get(host)
+    if limiter is None:
+        settings = get_settings()
+        limiter = AdaptiveRateLimiter(
+            host,
+            rate=settings.SCRAPER_RATE_INITIAL,
+            min_rate=settings.SCRAPER_RATE_MIN,
+            max_rate=settings.SCRAPER_RATE_MAX,
+            burst=settings.SCRAPER_RATE_BURST,
+            increase=settings.SCRAPER_RATE_INCREASE,
+            decrease_factor=settings.SCRAPER_RATE_DECREASE_FACTOR
+        )
+        _limiters[host] = limiter
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {host: limiter.stats() for host, limiter in _limiters.items()}
@@ -0,0 +1,41 @@
+import calendar
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+from core.config import TermWindow, get_settings
+
+
+def calendar_configured() -> bool:
+    return bool(get_settings().TERM_CALENDAR)
+
+
+def active_terms(today: Optional[date] = None) -> List[TermWindow]:
+    """Terms whose registration window includes `today`"""
+    today = today or date.today()
+    return [
+        term for term in get_settings().TERM_CALENDAR
+        if term.registration_opens <= today <= term.registration_closes
+    ]
+
+
+def closed_terms(today: Optional[date] = None) -> List[TermWindow]:
+    """Terms whose registration window has ended"""
+    today = today or date.today()
+    return [term for term in get_settings().TERM_CALENDAR if term.registration_closes < today]
+
+
+def find_term(semester: str, year: int) -> Optional[TermWindow]:
+    semester = getattr(semester, 'value', semester)
+    for term in get_settings().TERM_CALENDAR:
+        if term.semester == semester and term.year == int(year):
+            return term
+    return None
+
+
+def expires_at(term: TermWindow) -> int:
+    """DynamoDB TTL (epoch seconds) for a class in `term`"""
+    expiry = datetime.combine(
+        term.registration_closes + timedelta(days=get_settings().TERM_RETENTION_DAYS),
+        time.min
+    )
+    return calendar.timegm(expiry.timetuple())
@@ -1,9 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from mangum import Mangum
 from fastapi.middleware.cors import CORSMiddleware
+from core.aws_cognito import run_health_checks
+from core.config import get_settings
+from core.dependencies import get_aws_cognito
+from core.http_client import close_http_client
 from routes import base, auth, protected, course, notification
 
-app = FastAPI(title="Course Monitoring API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    health_checks = None
+    interval = get_settings().COGNITO_HEALTH_CHECK_INTERVAL_SECONDS
+    if interval > 0:
+        health_checks = asyncio.create_task(run_health_checks(get_aws_cognito(), interval))
+    
+    yield
+    
+    if health_checks is not None:
+        health_checks.cancel()
+    # Release pooled scraper connections when the server shuts down
+    await close_http_client()
+
+
+app = FastAPI(title="Course Monitoring API", lifespan=lifespan)
 
 origins = [
     "https://adamsulemanji.com",
@@ -30,6 +52,7 @@ app.add_middleware(
     allow_origins=origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(protected.router, prefix="/protected", tags=["Protected"])
@@ -39,4 +62,6 @@ app.include_router(notification.router, prefix="/notifications", tags=["Notifica
 app.include_router(base.router, tags=["Base"])
 
 
-handler = Mangum(app)
+# Mangum would run the lifespan on every invocation; keep it off so pooled
+# connections live as long as the Lambda container does
+handler = Mangum(app, lifespan="off")
@@ -0,0 +1,112 @@
+import functools
+import logging
+import threading
+from typing import Callable, Optional, TypeVar
+
+import anyio
+import boto3
+
+from core import metrics
+from core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AWSRepository:
+    """
+    AWS clients and DynamoDB tables shared by the whole process.
+
+    Clients are created on first use from the application settings and then
+    reused, so requests don't pay for building clients and connection pools.
+    DynamoDB is used through the one shared client, which is thread-safe
+    where resources and Table objects are not.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, session: Optional[boto3.session.Session] = None):
+        self.settings = settings or get_settings()
+        self._session = session or boto3.session.Session(region_name=self.settings.AWS_REGION_NAME)
+        self._lock = threading.Lock()
+        self._dynamodb_resource = None
+        self._sns = None
+        self._cognito = None
+
+    @property
+    def dynamodb_client(self):
+        """The shared DynamoDB client; it accepts and returns plain Python values like a resource"""
+        return self._shared_dynamodb().meta.client
+
+    @property
+    def sns(self):
+        if self._sns is None:
+            with self._lock:
+                if self._sns is None:
+                    self._sns = metrics.instrument_client(self._session.client('sns'))
+        return self._sns
+
+    @property
+    def sns_topic_arn(self) -> Optional[str]:
+        return self.settings.SNS_TOPIC_ARN
+
+    @property
+    def cognito(self):
+        if self._cognito is None:
+            with self._lock:
+                if self._cognito is None:
+                    self._cognito = self._session.client('cognito-idp')
+        return self._cognito
+
+    def _shared_dynamodb(self):
+        if self._dynamodb_resource is None:
+            with self._lock:
+                if self._dynamodb_resource is None:
+                    resource = self._session.resource('dynamodb')
+                    metrics.instrument_client(resource.meta.client)
+                    self._dynamodb_resource = resource
+        return self._dynamodb_resource
+
+
+_repository: Optional[AWSRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_aws() -> AWSRepository:
+    """The process-wide AWS repository, created on first use"""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = AWSRepository()
+    return _repository
+
+
+def set_aws(repository: Optional[AWSRepository]) -> Optional[AWSRepository]:
+    """
+    Replace the process-wide repository, e.g. with one pointed at a local
+    stand-in for tests. Pass None to go back to building one from settings.
+    Returns the repository that was replaced.
+    """
+    global _repository
+    with _repository_lock:
+        previous, _repository = _repository, repository
+    return previous
+
+
+_aws_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+async def run_aws(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking boto3 call in a worker thread and await its result.
+
+    AWS calls get their own pool of AWS_THREAD_POOL_SIZE threads, separate
+    from the one FastAPI uses for sync dependencies, so a slow AWS backend
+    queues AWS calls instead of stalling the event loop or starving other
+    requests of threads.
+    """
+    global _aws_limiter
+    if _aws_limiter is None:
+        # The limiter has to be created inside a running event loop
+        _aws_limiter = anyio.CapacityLimiter(get_aws().settings.AWS_THREAD_POOL_SIZE)
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_aws_limiter)
@@ -5,11 +5,15 @@ from pydantic import EmailStr
 from schemas.auth import AccessToken, ChangePassword, ConfirmForgotPassword, PhoneVerify, RefreshToken, UserSignin, UserSignup, UserVerify
 from services.auth import AuthService
 from core.aws_cognito import AWS_Cognito
-from core.dependencies import get_aws_cognito, get_current_user
+from core.dependencies import get_aws_cognito, get_current_user, get_jwks_manager, token_cache_stats
+from repositories.aws import run_aws
 
 
 router = APIRouter()
 
+# AuthService calls Cognito synchronously; every call is run on the AWS thread
+# pool so a slow Cognito response doesn't hold up other requests
+
 @router.get("/")
 def base():
     return "Hi, this is my base route from the auth router"
@@ -18,7 +22,7 @@ def base():
 # USER SIGNUP
 @router.post('/signup', status_code=status.HTTP_201_CREATED, tags=['Auth'])
 async def signup_user(user: UserSignup, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.user_signup(user, cognito)
+    return await run_aws(AuthService.user_signup, user, cognito)
 
 
 @router.post('/verify_account', status_code=status.HTTP_200_OK, tags=["Auth"])
@@ -26,65 +30,78 @@ async def verify_account(
     data: UserVerify,
     cognito: AWS_Cognito = Depends(get_aws_cognito),
 ):
-    return AuthService.verify_account(data, cognito)
+    return await run_aws(AuthService.verify_account, data, cognito)
 
 
 # RESEND CONFIRMATION CODE
 @router.post('/resend_confirmation_code', status_code=status.HTTP_200_OK, tags=['Auth'])
 async def resend_confirmation_code(email: EmailStr, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.resend_confirmation_code(email, cognito)
+    return await run_aws(AuthService.resend_confirmation_code, email, cognito)
 
 
 # USER SIGNIN
 @router.post('/signin', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def signin(data: UserSignin, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.user_signin(data, cognito)
+    return await run_aws(AuthService.user_signin, data, cognito)
 
 
 # FORGOT PASSWORD
 @router.post('/forgot_password', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def forgot_password(email: EmailStr, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.forgot_password(email, cognito)
+    return await run_aws(AuthService.forgot_password, email, cognito)
 
 
 # CONFIRM FORGOT PASSWORD
 @router.post('/confirm_forgot_password', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def confirm_forgot_password(data: ConfirmForgotPassword, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.confirm_forgot_password(data, cognito)
+    return await run_aws(AuthService.confirm_forgot_password, data, cognito)
 
 
 # CHANGE PASSWORD
 @router.post('/change_password', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def change_password(data: ChangePassword, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.change_password(data, cognito)
+    return await run_aws(AuthService.change_password, data, cognito)
 
 
 # GENERATE NEW ACCESS TOKEN
 @router.post('/new_token', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def new_access_token(refresh_token: RefreshToken, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.new_access_token(refresh_token.refresh_token, cognito)
+    return await run_aws(AuthService.new_access_token, refresh_token.refresh_token, cognito)
 
 
 # LOGOUT
 @router.post('/logout', status_code=status.HTTP_204_NO_CONTENT, tags=["Auth"])
 async def logout(access_token: AccessToken, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.logout(access_token.access_token, cognito)
+    return await run_aws(AuthService.logout, access_token.access_token, cognito)
 
 
 # GET USER DETAILS
 @router.get('/user_details', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def user_details(email: EmailStr, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.user_details(email, cognito)
+    return await run_aws(AuthService.user_details, email, cognito)
 
 
 # PHONE VERIFICATION
 @router.post('/request_phone_verification', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def request_phone_verification(email: EmailStr, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.request_phone_verification(email, cognito)
+    return await run_aws(AuthService.request_phone_verification, email, cognito)
 
 @router.post('/confirm_phone_verification', status_code=status.HTTP_200_OK, tags=["Auth"])
 async def confirm_phone_verification(data: PhoneVerify, cognito: AWS_Cognito = Depends(get_aws_cognito)):
-    return AuthService.confirm_phone_verification(data, cognito)
+    return await run_aws(AuthService.confirm_phone_verification, data, cognito)
+
+
+# TOKEN CACHE STATS
+@router.get('/token_cache/stats', status_code=status.HTTP_200_OK, tags=["Auth"])
+async def token_cache(current_user: dict = Depends(get_current_user)):
+    """Verified-token cache and signing key statistics for monitoring (admin only)"""
+    if 'admin' not in current_user.get('groups', []):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can perform this action"
+        )
+    
+    return {**token_cache_stats(), 'jwks': get_jwks_manager().stats()}
 
 
 # PROTECTED ROUTE EXAMPLE
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
 
+from core.circuit_breaker import circuit_breaker_stats
 from core.dependencies import get_current_user
+from core.rate_limiter import rate_limiter_stats
 from schemas.course import CourseCreate, Course
 from services.course import CourseService
+from services.scraper import CourseScraperService
 
 router = APIRouter(
     prefix="/courses",
@@ -21,10 +24,36 @@ async def add_course(
     return await CourseService.add_course(user_id, course)
 
 @router.get("/", status_code=status.HTTP_200_OK, response_model=List[Course])
-async def get_user_courses(current_user: dict = Depends(get_current_user)):
-    """Get all courses tracked by the current user"""
+async def get_user_courses(
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=100, description="Maximum number of courses to return"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor value from the previous page"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the courses tracked by the current user.
+    
+    Pass `limit` to page through large watchlists; when more courses remain,
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    """
     user_id = current_user.get("username")
-    return await CourseService.get_user_courses(user_id)
+    try:
+        courses, next_cursor = await CourseService.get_user_courses_page(user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return courses
+
+@router.delete("/{class_id}", status_code=status.HTTP_200_OK)
+async def remove_course(
+    class_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stop tracking a course for the current user"""
+    user_id = current_user.get("username")
+    return await CourseService.remove_course(user_id, class_id)
 
 @router.post("/check", status_code=status.HTTP_200_OK)
 async def check_all_courses(current_user: dict = Depends(get_current_user)):
@@ -46,4 +75,31 @@ async def notify_users(current_user: dict = Depends(get_current_user)):
             detail="Only admin users can perform this action"
         )
     
-    return await CourseService.notify_users_for_open_courses() 
\ No newline at end of file
+    return await CourseService.notify_users_for_open_courses()
+
+@router.post("/terms/expire", status_code=status.HTTP_200_OK)
+async def expire_closed_terms(current_user: dict = Depends(get_current_user)):
+    """Schedule classes from terms whose registration has closed for expiry (admin only)"""
+    if 'admin' not in current_user.get('groups', []):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can perform this action"
+        )
+    
+    return await CourseService.expire_closed_terms()
+
+@router.get("/scraper/stats", status_code=status.HTTP_200_OK)
+async def scraper_stats(current_user: dict = Depends(get_current_user)):
+    """Scraper cache, rate limiter and circuit breaker statistics for monitoring (admin only)"""
+    if 'admin' not in current_user.get('groups', []):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can perform this action"
+        )
+    
+    return {
+        'page_cache': CourseScraperService.cache_stats(),
+        'availability_cache': CourseScraperService.availability_cache_stats(),
+        'rate_limiters': rate_limiter_stats(),
+        'circuit_breakers': circuit_breaker_stats()
+    }
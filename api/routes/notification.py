@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Optional
 from pydantic import BaseModel, EmailStr
 
-from core.dependencies import get_current_user
+from core.aws_cognito import AWS_Cognito
+from core.dependencies import get_aws_cognito, get_current_user
 from services.notification import NotificationService
 
 router = APIRouter(
@@ -28,7 +29,22 @@ async def subscribe_to_notifications(
             detail="User email not found"
         )
     
-    return NotificationService.subscribe_user_to_notifications(
+    return await NotificationService.subscribe_user_to_notifications(
+        user_id=current_user.get("username"),
         email=email,
         phone_number=subscription.phone_number
-    ) 
\ No newline at end of file
+    )
+
+@router.post("/migrate", status_code=status.HTTP_200_OK)
+async def migrate_subscriptions(
+    current_user: dict = Depends(get_current_user),
+    cognito: AWS_Cognito = Depends(get_aws_cognito)
+):
+    """Add per-user filter policies to existing subscriptions (admin only)"""
+    if 'admin' not in current_user.get('groups', []):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can perform this action"
+        )
+    
+    return await NotificationService.migrate_subscriptions(cognito) 
\ No newline at end of file
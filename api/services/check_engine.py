@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+
+class CheckEngine:
+    """
+    Runs course checks concurrently with a bounded number of workers.
+
+    Each check gets its own timeout, and results are collected in the order
+    the checks complete rather than the order they were submitted.
+    """
+
+    def __init__(self, concurrency: int = 20, timeout: float = 45.0):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+
+    async def run(
+        self,
+        items: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        check: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Run `check` for every item and return the results as they complete.
+
+        `items` may be an async iterable, in which case checks start as soon
+        as each item arrives instead of after all items have been collected.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(check(item), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"Check timed out for class {item.get('class_id')}")
+                    return self.failed_result(item, "Check timed out")
+                except Exception as e:
+                    logger.error(f"Check failed for class {item.get('class_id')}: {e}")
+                    return self.failed_result(item, str(e))
+
+        tasks = []
+        try:
+            if hasattr(items, '__aiter__'):
+                async for item in items:
+                    tasks.append(asyncio.ensure_future(worker(item)))
+            else:
+                for item in items:
+                    tasks.append(asyncio.ensure_future(worker(item)))
+        except BaseException:
+            # Producing the items failed; don't leave checks running unattended
+            for task in tasks:
+                task.cancel()
+            raise
+
+        results = []
+        for next_done in asyncio.as_completed(tasks):
+            results.append(await next_done)
+
+        return results
+
+    @staticmethod
+    def failed_result(item: Dict[str, Any], error: str) -> Dict[str, Any]:
+        """Result for a check that did not finish; never reported as a status change"""
+        previous_status = item.get('is_open', False)
+        return {
+            'class_id': item.get('class_id'),
+            'is_open': previous_status,
+            'seats_available': item.get('seats_available', 0),
+            'status_changed': False,
+            'previous_status': previous_status,
+            'error': error
+        }
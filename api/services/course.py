@@ -1,17 +1,58 @@
-import boto3
+import asyncio
+import botocore.exceptions
 import uuid
 import time
-from typing import List, Dict, Any, Optional
-import os
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import logging
 from datetime import datetime
+from fastapi import HTTPException
 
+from core.cache import SingleFlight
+from core import metrics, terms
+from core.config import get_settings
+from core.dynamodb import batch_get_items, decode_cursor, encode_cursor
+from repositories.aws import get_aws, run_aws
 from schemas.course import CourseCreate, Course, UserCourse
+from services.check_engine import CheckEngine
 from services.notification import NotificationService
+from services.scheduler import PollScheduler
 from services.scraper import CourseScraperService
 
 logger = logging.getLogger(__name__)
 
+_sweep_flight = SingleFlight()
+
+
+# DynamoDB's limit on statements per BatchExecuteStatement request
+BATCH_STATEMENT_MAX = 25
+
+# Attributes of a class returned by the courses API
+COURSE_PROJECTION = "class_id, crn, #year, semester, is_open, last_checked"
+COURSE_ATTRIBUTE_NAMES = {'#year': 'year'}
+
+# Attributes of a class the availability checker reads
+CLASS_CHECK_PROJECTION = (
+    "class_id, crn, #year, semester, is_open, seats_available, last_checked, "
+    "watcher_count, next_check_at, last_changed, seat_volatility"
+)
+CLASS_CHECK_ATTRIBUTE_NAMES = {'#year': 'year'}
+
+# Skip classes nobody tracks; classes added before watcher counts existed
+# have no count and are still checked
+WATCHED_FILTER = "attribute_not_exists(watcher_count) OR watcher_count > :zero"
+
+# Skip scheduled classes whose next check hasn't come yet. next_check_at is an
+# ISO timestamp, so comparing it as a string compares it in time
+DUE_FILTER = "attribute_not_exists(next_check_at) OR next_check_at <= :now"
+
+
+def _check_filter(due_by: Optional[datetime]) -> Tuple[str, Dict[str, Any]]:
+    """The FilterExpression and its values for reading the classes to check"""
+    if due_by is None:
+        return WATCHED_FILTER, {':zero': 0}
+    return f"({WATCHED_FILTER}) AND ({DUE_FILTER})", {':zero': 0, ':now': due_by.isoformat()}
+
+
 class CourseService:
     @staticmethod
     def create_course_id(crn: str, year: int, semester: str) -> str:
@@ -21,47 +62,62 @@ class CourseService:
     @staticmethod
     async def add_course(user_id: str, course_data: CourseCreate):
         """Add a course for a user to track"""
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-        classes_table = dynamodb.Table(os.environ.get('CLASSES_TABLE_NAME', 'Course-Classes'))
-        user_courses_table = dynamodb.Table(os.environ.get('USER_COURSES_TABLE_NAME', 'Course-UserCourses'))
+        aws = get_aws()
+        client = aws.dynamodb_client
+        classes_table_name = aws.settings.CLASSES_TABLE_NAME
         
         # Create class_id from course details
         class_id = CourseService.create_course_id(
             course_data.crn, course_data.year, course_data.semester
         )
         
+        # Let DynamoDB remove the class, and who tracks it, once its term is over
+        term = terms.find_term(course_data.semester, course_data.year)
+        expires_at = terms.expires_at(term) if term is not None else None
+        
         # Check if class already exists
         try:
-            response = classes_table.get_item(
+            response = await run_aws(
+                client.get_item,
+                TableName=classes_table_name,
                 Key={'class_id': class_id}
             )
             
             # If class doesn't exist, add it
             if 'Item' not in response:
                 # Check course availability when adding
-                availability = await CourseScraperService.simulate_course_availability(
+                availability = await CourseScraperService.get_course_availability(
                     course_data.crn, course_data.year, course_data.semester
                 )
                 
-                classes_table.put_item(
-                    Item={
-                        'class_id': class_id,
-                        'crn': course_data.crn,
-                        'year': course_data.year,
-                        'semester': course_data.semester,
-                        'is_open': availability.get('is_open', False),
-                        'seats_available': availability.get('seats_available', 0),
-                        'last_checked': datetime.now().isoformat(),
-                    }
-                )
-        
-            # Add the class to user's tracked classes
-            user_courses_table.put_item(
-                Item={
-                    'user_id': user_id,
-                    'class_id': class_id
+                item = {
+                    'class_id': class_id,
+                    'crn': course_data.crn,
+                    'year': course_data.year,
+                    'semester': course_data.semester,
+                    'is_open': availability.get('is_open', False),
+                    'seats_available': availability.get('seats_available', 0),
+                    'last_checked': datetime.now().isoformat(),
+                    'watcher_count': 0,
                 }
-            )
+                if expires_at is not None:
+                    item['expires_at'] = expires_at
+                
+                try:
+                    # Another user may be adding the same class; don't reset its watchers
+                    await run_aws(
+                        client.put_item,
+                        TableName=classes_table_name,
+                        Item=item,
+                        ConditionExpression="attribute_not_exists(class_id)"
+                    )
+                except botocore.exceptions.ClientError as e:
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+            
+            # Add the class to user's tracked classes and count the new watcher
+            if not await CourseService.update_watchers(user_id, class_id, tracking=True, expires_at=expires_at):
+                return {'message': 'Course already tracked', 'class_id': class_id}
             
             return {'message': 'Course added successfully', 'class_id': class_id}
             
@@ -70,176 +126,872 @@ class CourseService:
             raise e
     
     @staticmethod
-    async def get_user_courses(user_id: str) -> List[Course]:
-        """Get all courses tracked by a user"""
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-        user_courses_table = dynamodb.Table(os.environ.get('USER_COURSES_TABLE_NAME', 'Course-UserCourses'))
-        classes_table = dynamodb.Table(os.environ.get('CLASSES_TABLE_NAME', 'Course-Classes'))
+    async def remove_course(user_id: str, class_id: str):
+        """Stop tracking a course for a user"""
+        try:
+            removed = await CourseService.update_watchers(user_id, class_id, tracking=False)
+        except Exception as e:
+            logger.error(f"Error removing course: {e}")
+            raise e
+        
+        if not removed:
+            raise HTTPException(
+                status_code=404,
+                detail="Course is not tracked by this user"
+            )
+        
+        return {'message': 'Course removed successfully', 'class_id': class_id}
+    
+    @staticmethod
+    async def update_watchers(user_id: str, class_id: str, tracking: bool, expires_at: Optional[int] = None) -> bool:
+        """
+        Add or remove a user-course mapping and adjust the class's watcher_count
+        in the same transaction, so the count can never drift from the mappings.
+        A new mapping gets the class's `expires_at` so both expire together.
+        
+        Returns False without changing anything if the user was already (or was
+        not) tracking the class. A mapping whose class has already expired is
+        removed on its own. A class created before watcher counts existed has
+        its count seeded from its mappings first.
+        """
+        aws = get_aws()
+        classes_table_name = aws.settings.CLASSES_TABLE_NAME
+        user_courses_table_name = aws.settings.USER_COURSES_TABLE_NAME
+        mapping = {'user_id': user_id, 'class_id': class_id}
+        
+        if tracking:
+            item = dict(mapping)
+            if expires_at is not None:
+                item['expires_at'] = expires_at
+            mapping_write = {'Put': {
+                'TableName': user_courses_table_name,
+                'Item': item,
+                'ConditionExpression': "attribute_not_exists(user_id)"
+            }}
+        else:
+            mapping_write = {'Delete': {
+                'TableName': user_courses_table_name,
+                'Key': mapping,
+                'ConditionExpression': "attribute_exists(user_id)"
+            }}
+        
+        count_update = {'Update': {
+            'TableName': classes_table_name,
+            'Key': {'class_id': class_id},
+            'UpdateExpression': "ADD watcher_count :delta",
+            # ADD on a missing count would start it from 0 and lose the
+            # watchers whose mappings predate it
+            'ConditionExpression': "attribute_exists(class_id) AND attribute_exists(watcher_count)",
+            'ExpressionAttributeValues': {':delta': 1 if tracking else -1}
+        }}
+        
+        for attempt in range(2):
+            try:
+                await run_aws(aws.dynamodb_client.transact_write_items, TransactItems=[mapping_write, count_update])
+                return True
+            except botocore.exceptions.ClientError as e:
+                if e.response['Error']['Code'] != 'TransactionCanceledException':
+                    raise
+                cancelled = e
+                reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+                # Only the mapping's condition failing means "nothing to do"
+                if reasons and reasons[0] == 'ConditionalCheckFailed':
+                    return False
+                if reasons[1:] != ['ConditionalCheckFailed']:
+                    raise
+            
+            # The class has no watcher_count yet, or its row is gone
+            if attempt == 0 and await CourseService.seed_watcher_count(class_id):
+                continue
+            # The class row is gone (its term expired) but the mapping is still
+            # there; there's no count left to keep in step, so just drop it
+            if not tracking:
+                return await CourseService.delete_mapping(user_id, class_id)
+            break
+        
+        raise cancelled
+    
+    @staticmethod
+    async def seed_watcher_count(class_id: str) -> bool:
+        """
+        Give a class that predates watcher counts a count of its current mappings.
+        
+        Mappings are only added or removed together with the count, so none
+        change while it is missing. Returns False if the class doesn't exist.
+        """
+        aws = get_aws()
+        client = aws.dynamodb_client
+        
+        query_kwargs = {
+            'TableName': aws.settings.USER_COURSES_TABLE_NAME,
+            'IndexName': 'class-users-index',
+            'KeyConditionExpression': "class_id = :class_id",
+            'ExpressionAttributeValues': {':class_id': class_id},
+            'Select': 'COUNT'
+        }
+        watchers = 0
+        while True:
+            response = await run_aws(client.query, **query_kwargs)
+            watchers += response.get('Count', 0)
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        try:
+            await run_aws(
+                client.update_item,
+                TableName=aws.settings.CLASSES_TABLE_NAME,
+                Key={'class_id': class_id},
+                UpdateExpression="SET watcher_count = :watchers",
+                ConditionExpression="attribute_exists(class_id) AND attribute_not_exists(watcher_count)",
+                ExpressionAttributeValues={':watchers': watchers}
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # Either another request seeded it first or the class is gone
+            response = await run_aws(
+                client.get_item,
+                TableName=aws.settings.CLASSES_TABLE_NAME,
+                Key={'class_id': class_id},
+                ProjectionExpression="class_id"
+            )
+            return 'Item' in response
+        
+        logger.info(f"Seeded watcher_count={watchers} for {class_id}")
+        return True
+    
+    @staticmethod
+    async def delete_mapping(user_id: str, class_id: str) -> bool:
+        """Remove a user-course mapping on its own; False if there wasn't one"""
+        aws = get_aws()
+        try:
+            await run_aws(
+                aws.dynamodb_client.delete_item,
+                TableName=aws.settings.USER_COURSES_TABLE_NAME,
+                Key={'user_id': user_id, 'class_id': class_id},
+                ConditionExpression="attribute_exists(user_id)"
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            return False
+        return True
+    
+    @staticmethod
+    async def get_user_courses_page(
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Course], Optional[str]]:
+        """
+        Get a page of the courses tracked by a user.
+        
+        Without a `limit` every page of the user's mappings is read. Returns
+        the courses and the cursor for the next page (None on the last page).
+        Class details are fetched with BatchGetItem rather than one read per class.
+        """
+        aws = get_aws()
         
         try:
             # Get user's tracked classes
-            response = user_courses_table.query(
-                KeyConditionExpression="user_id = :user_id",
-                ExpressionAttributeValues={
+            query_kwargs = {
+                'TableName': aws.settings.USER_COURSES_TABLE_NAME,
+                'KeyConditionExpression': "user_id = :user_id",
+                'ExpressionAttributeValues': {
                     ':user_id': user_id
-                }
-            )
+                },
+                'ProjectionExpression': 'class_id'
+            }
+            if cursor:
+                query_kwargs['ExclusiveStartKey'] = decode_cursor(cursor, ('user_id', 'class_id'), {'user_id': user_id})
             
-            if 'Items' not in response or not response['Items']:
-                return []
-                
-            # Get details for each class
-            courses = []
-            for item in response['Items']:
-                class_id = item['class_id']
-                class_response = classes_table.get_item(
-                    Key={'class_id': class_id}
-                )
+            class_ids = []
+            while True:
+                if limit:
+                    query_kwargs['Limit'] = limit - len(class_ids)
+                response = await run_aws(aws.dynamodb_client.query, **query_kwargs)
+                class_ids.extend(item['class_id'] for item in response.get('Items', []))
                 
-                if 'Item' in class_response:
-                    courses.append(class_response['Item'])
+                last_evaluated_key = response.get('LastEvaluatedKey')
+                if not last_evaluated_key or (limit and len(class_ids) >= limit):
+                    break
+                query_kwargs['ExclusiveStartKey'] = last_evaluated_key
+            
+            if not class_ids:
+                return [], encode_cursor(last_evaluated_key)
+            
+            # Get details for every class in batches
+            items = await batch_get_items(
+                aws.dynamodb_client,
+                aws.settings.CLASSES_TABLE_NAME,
+                [{'class_id': class_id} for class_id in class_ids],
+                projection=COURSE_PROJECTION,
+                attribute_names=COURSE_ATTRIBUTE_NAMES
+            )
+            
+            # BatchGetItem doesn't preserve order; keep the user's order
+            items_by_id = {item['class_id']: item for item in items}
+            courses = [items_by_id[class_id] for class_id in class_ids if class_id in items_by_id]
             
-            return courses
+            return courses, encode_cursor(last_evaluated_key)
             
         except Exception as e:
             logger.error(f"Error getting user courses: {e}")
             raise e
     
     @staticmethod
-    async def check_course_availability(class_id: str):
-        """Check if a course is available using the web scraper"""
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-        classes_table = dynamodb.Table(os.environ.get('CLASSES_TABLE_NAME', 'Course-Classes'))
+    async def check_course_availability(
+        class_id: str,
+        availability: Optional[Dict[str, Any]] = None,
+        course: Optional[Dict[str, Any]] = None,
+        heartbeats: Optional[List[Tuple[str, Optional[str]]]] = None,
+        scheduler: Optional[PollScheduler] = None
+    ):
+        """
+        Check if a course is available using the web scraper.
         
-        # Get the course details
-        course_response = classes_table.get_item(
-            Key={'class_id': class_id}
-        )
+        If `availability` has already been fetched (e.g. by a term-level batch
+        scrape) it is used as-is instead of scraping the course again. Pass the
+        class item as `course` when it has already been read (e.g. by the scan)
+        to avoid reading it again.
         
-        if 'Item' not in course_response:
-            logger.error(f"Course with ID {class_id} not found")
-            return {
-                'class_id': class_id,
-                'error': 'Course not found'
-            }
+        The class is only written when its open state or seat count changed.
+        Otherwise last_checked is refreshed at most every CLASS_HEARTBEAT_SECONDS;
+        pass a `heartbeats` list to collect those writes for one batched
+        write instead of writing each one immediately.
+        
+        With a `scheduler`, every check also records when the class is next due.
+        """
+        aws = get_aws()
+        classes_table_name = aws.settings.CLASSES_TABLE_NAME
+        metrics.incr('classes_checked')
+        
+        # Get the course details
+        if course is None:
+            course_response = await run_aws(
+                aws.dynamodb_client.get_item,
+                TableName=classes_table_name,
+                Key={'class_id': class_id}
+            )
             
-        course = course_response['Item']
+            if 'Item' not in course_response:
+                logger.error(f"Course with ID {class_id} not found")
+                return {
+                    'class_id': class_id,
+                    'is_open': False,
+                    'status_changed': False,
+                    'error': 'Course not found'
+                }
+                
+            course = course_response['Item']
+        
         previous_status = course.get('is_open', False)
         
         # Use the scraper to check availability
-        # In production, use the real scraper
-        # availability = await CourseScraperService.check_course_availability(
-        availability = await CourseScraperService.simulate_course_availability(
-            course.get('crn'),
-            course.get('year'),
-            course.get('semester')
-        )
+        if availability is None:
+            availability = await CourseScraperService.get_course_availability(
+                course.get('crn'),
+                course.get('year'),
+                course.get('semester')
+            )
+        
+        # The registration site is down or the circuit is open: keep the last
+        # known status rather than recording the course as closed
+        if availability.get('upstream_unavailable'):
+            return {
+                'class_id': class_id,
+                'is_open': previous_status,
+                'seats_available': course.get('seats_available', 0),
+                'status_changed': False,
+                'previous_status': previous_status,
+                'error': availability.get('error', 'Upstream unavailable'),
+                'upstream_unavailable': True
+            }
         
         is_open = availability.get('is_open', False)
         seats_available = availability.get('seats_available', 0)
+        previous_seats = int(course.get('seats_available') or 0)
+        now = datetime.now()
         
-        # Update course status
-        classes_table.update_item(
-            Key={'class_id': class_id},
-            UpdateExpression="SET is_open = :is_open, seats_available = :seats_available, last_checked = :last_checked",
-            ExpressionAttributeValues={
-                ':is_open': is_open,
-                ':seats_available': seats_available,
-                ':last_checked': datetime.now().isoformat()
+        if is_open != previous_status or seats_available != previous_seats:
+            # Update course status only when something actually changed
+            changed = {
+                'is_open': is_open,
+                'seats_available': seats_available,
+                'last_checked': now.isoformat(),
+                'last_changed': now.isoformat(),
+                'seat_volatility': PollScheduler.updated_volatility(course, seats_available - previous_seats, now)
             }
-        )
+            if scheduler is not None:
+                changed['next_check_at'] = scheduler.next_check_at({**course, **changed}, now)
+            
+            values = {f":{name}": value for name, value in changed.items()}
+            if 'is_open' in course:
+                condition = "is_open = :previous_status"
+                values[':previous_status'] = previous_status
+            else:
+                condition = "attribute_not_exists(is_open)"
+            
+            try:
+                # Only the run that saw the old status records the change, so
+                # overlapping runs can't both report the same transition
+                await run_aws(
+                    aws.dynamodb_client.update_item,
+                    TableName=classes_table_name,
+                    Key={'class_id': class_id},
+                    UpdateExpression="SET " + ", ".join(f"{name} = :{name}" for name in changed),
+                    ConditionExpression=condition,
+                    ExpressionAttributeValues=values
+                )
+            except botocore.exceptions.ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                metrics.incr('status_write_conflicts')
+                return {
+                    'class_id': class_id,
+                    'is_open': is_open,
+                    'seats_available': seats_available,
+                    'status_changed': False,
+                    'previous_status': previous_status
+                }
+            metrics.incr('status_writes')
+        elif CourseService.heartbeat_due(course, now) or (
+            scheduler is not None and scheduler.interval_changed(course, now)
+        ):
+            # Nothing changed, but last_checked is getting stale or the class's
+            # schedule has moved. Between heartbeats a scheduled class keeps its
+            # stored next_check_at and stays due, which costs a recheck rather
+            # than a write on every check
+            next_check_at = scheduler.next_check_at(course, now) if scheduler is not None else None
+            if heartbeats is not None:
+                heartbeats.append((class_id, next_check_at))
+            else:
+                await CourseService.write_heartbeats([(class_id, next_check_at)], now)
+        else:
+            metrics.incr('writes_avoided')
         
         # Return status change information
-        return {
+        result = {
             'class_id': class_id, 
             'is_open': is_open,
             'seats_available': seats_available,
             'status_changed': is_open != previous_status,
             'previous_status': previous_status
         }
+        if result['status_changed']:
+            # Identifies this transition in the notification ledger
+            result['transition_id'] = now.isoformat()
+        return result
+    
+    @staticmethod
+    def heartbeat_due(course: Dict[str, Any], now: datetime) -> bool:
+        """Whether an unchanged class's last_checked should be refreshed"""
+        try:
+            last_checked = datetime.fromisoformat(course['last_checked'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return (now - last_checked).total_seconds() >= get_settings().CLASS_HEARTBEAT_SECONDS
+    
+    @staticmethod
+    async def write_heartbeats(heartbeats: List[Tuple[str, Optional[str]]], checked_at: Optional[datetime] = None):
+        """
+        Refresh last_checked, and next_check_at when one is given, for
+        unchanged classes with batched PartiQL updates.
+        
+        `heartbeats` holds (class_id, next_check_at) pairs.
+        """
+        if not heartbeats:
+            return
+        
+        aws = get_aws()
+        table_name = aws.settings.CLASSES_TABLE_NAME
+        last_checked = (checked_at or datetime.now()).isoformat()
+        
+        def heartbeat_statement(class_id: str, next_check_at: Optional[str]) -> Dict[str, Any]:
+            if next_check_at is None:
+                return {
+                    'Statement': f'UPDATE "{table_name}" SET last_checked = ? WHERE class_id = ?',
+                    'Parameters': [last_checked, class_id]
+                }
+            return {
+                'Statement': f'UPDATE "{table_name}" SET last_checked = ? SET next_check_at = ? WHERE class_id = ?',
+                'Parameters': [last_checked, next_check_at, class_id]
+            }
+        
+        async def write_chunk(chunk: List[Tuple[str, Optional[str]]]):
+            response = await run_aws(
+                aws.dynamodb_client.batch_execute_statement,
+                Statements=[heartbeat_statement(class_id, next_check_at) for class_id, next_check_at in chunk]
+            )
+            failed = [entry for entry in response.get('Responses', []) if 'Error' in entry]
+            if failed:
+                logger.warning(f"{len(failed)} heartbeat writes failed, e.g. {failed[0]['Error']}")
+            metrics.incr('heartbeat_writes', len(chunk) - len(failed))
+        
+        chunks = [heartbeats[i:i + BATCH_STATEMENT_MAX] for i in range(0, len(heartbeats), BATCH_STATEMENT_MAX)]
+        results = await asyncio.gather(*(write_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error writing heartbeats: {result!r}")
     
     @staticmethod
     async def check_all_courses():
         """Check all courses for availability"""
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-        classes_table = dynamodb.Table(os.environ.get('CLASSES_TABLE_NAME', 'Course-Classes'))
+        results, _ = await CourseService.shared_check_cycle()
+        return results
+    
+    @staticmethod
+    async def shared_check_cycle() -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Run a check cycle, or join the one already in progress.
         
-        # Scan all classes
-        response = classes_table.scan()
-        courses = response.get('Items', [])
+        Overlapping calls (scheduled runs, manual admin checks) share the sweep
+        that is already running instead of starting another one.
+        """
+        if metrics.current_cycle() is None:
+            metrics.start_cycle()
+        return await _sweep_flight.do('check_all_courses', CourseService.run_check_cycle)
+    
+    @staticmethod
+    async def run_check_cycle() -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Check the availability of every watched class in the active terms.
         
-        results = []
-        for course in courses:
-            result = await CourseService.check_course_availability(course['class_id'])
-            results.append(result)
+        Returns the check results along with the class items read keyed by
+        class_id, so later stages never have to read a class again.
+        """
+        settings = get_settings()
+        engine = CheckEngine(
+            concurrency=settings.CHECK_CONCURRENCY,
+            timeout=settings.CHECK_TIMEOUT_SECONDS
+        )
+        
+        courses: Dict[str, Dict[str, Any]] = {}
+        availability: Dict[str, Dict[str, Any]] = {}
+        heartbeats: List[Tuple[str, Optional[str]]] = []
+        scheduler = PollScheduler.from_settings() if settings.SCHEDULER_ENABLED else None
+        
+        async def classes():
+            # Feed classes to the engine page by page as they are read. With a
+            # scheduler budget the due classes are all read before the first
+            # check, since the most overdue can't be picked until then
+            if scheduler is not None:
+                now = datetime.now()
+                pages = CourseService.schedule_classes(CourseService.select_classes(due_by=now), scheduler, now)
+            else:
+                pages = CourseService.select_classes()
             
-        return results
+            async for page in pages:
+                # Scrape each term's listing once instead of once per CRN
+                availability.update(await CourseService.fetch_term_availability(page, engine))
+                for course in page:
+                    courses[course['class_id']] = course
+                    yield course
+        
+        results = await engine.run(
+            classes(),
+            lambda course: CourseService.check_course_availability(
+                course['class_id'],
+                availability=availability.pop(course['class_id'], None),
+                course=course,
+                heartbeats=heartbeats,
+                scheduler=scheduler
+            )
+        )
+        await CourseService.write_heartbeats(heartbeats)
+        
+        cycle = metrics.current_cycle()
+        if cycle is not None:
+            logger.info(f"Check cycle finished: {cycle.as_dict()}")
+        
+        return results, courses
+    
+    @staticmethod
+    async def schedule_classes(
+        pages: AsyncIterator[List[Dict[str, Any]]],
+        scheduler: PollScheduler,
+        now: datetime
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Narrow the due classes down to those this run has the budget to check.
+        
+        Without a budget every due class is checked, so pages pass straight
+        through. With one, only the `budget` most overdue classes are held
+        while the pages are read, and they come back as a single page once
+        every candidate has been seen.
+        
+        That gives up starting checks while the read is still running. Checking
+        classes as they arrive until the budget fills would hand the budget to
+        whichever classes the scan returns first, and when a run is over
+        budget the same classes at the end of the scan order would be deferred
+        every time. Set SCHEDULER_BUDGET_PER_RUN to 0 to stream instead.
+        """
+        if scheduler.budget <= 0:
+            async for page in pages:
+                selection = scheduler.selection(now)
+                selection.add(page)
+                due = selection.result()
+                if due:
+                    yield due
+            return
+        
+        selection = scheduler.selection(now)
+        async for page in pages:
+            selection.add(page)
+        
+        selected = selection.result()
+        if selected:
+            yield selected
+    
+    @staticmethod
+    def select_classes(due_by: Optional[datetime] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the watched classes this cycle should check, one page at a time.
+        
+        With a term calendar configured only the terms whose registration is
+        open are read, through the semester-year-index GSI. Without one every
+        class in the table is scanned. With `due_by`, classes scheduled for
+        a later check are filtered out by DynamoDB. Under a scheduler budget
+        schedule_classes holds the pages back until the read finishes, see
+        there for why.
+        """
+        if terms.calendar_configured():
+            return CourseService.query_active_classes(due_by=due_by)
+        return CourseService.scan_classes(due_by=due_by)
+    
+    @staticmethod
+    def query_active_classes(due_by: Optional[datetime] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream the watched classes of every active term, querying the terms concurrently"""
+        settings = get_settings()
+        filter_expression, filter_values = _check_filter(due_by)
+        requests = []
+        for term in terms.active_terms():
+            query_kwargs = {
+                'IndexName': 'semester-year-index',
+                'KeyConditionExpression': "semester = :semester AND #year = :year",
+                'ProjectionExpression': CLASS_CHECK_PROJECTION,
+                'ExpressionAttributeNames': CLASS_CHECK_ATTRIBUTE_NAMES,
+                'FilterExpression': filter_expression,
+                'ExpressionAttributeValues': {':semester': term.semester, ':year': term.year, **filter_values}
+            }
+            if settings.CLASSES_SCAN_PAGE_SIZE:
+                query_kwargs['Limit'] = settings.CLASSES_SCAN_PAGE_SIZE
+            requests.append(query_kwargs)
+        
+        return CourseService.read_class_pages('query', requests)
+    
+    @staticmethod
+    def scan_classes(
+        segments: Optional[int] = None,
+        due_by: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream every watched class in the classes table, one page at a time.
+        
+        When `segments` > 1, runs that many DynamoDB parallel scan segments
+        concurrently. Only the attributes the checker needs are read, and
+        with `due_by` only the classes due for a check.
+        """
+        settings = get_settings()
+        total_segments = max(1, segments or settings.CLASSES_SCAN_SEGMENTS)
+        filter_expression, filter_values = _check_filter(due_by)
+        requests = []
+        for segment in range(total_segments):
+            scan_kwargs = {
+                'ProjectionExpression': CLASS_CHECK_PROJECTION,
+                'ExpressionAttributeNames': CLASS_CHECK_ATTRIBUTE_NAMES,
+                'FilterExpression': filter_expression,
+                'ExpressionAttributeValues': dict(filter_values)
+            }
+            if total_segments > 1:
+                scan_kwargs.update(Segment=segment, TotalSegments=total_segments)
+            if settings.CLASSES_SCAN_PAGE_SIZE:
+                scan_kwargs['Limit'] = settings.CLASSES_SCAN_PAGE_SIZE
+            requests.append(scan_kwargs)
+        
+        return CourseService.read_class_pages('scan', requests)
+    
+    @staticmethod
+    async def read_class_pages(operation: str, requests: List[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Run several scan or query requests against the classes table concurrently
+        and yield their pages as they arrive, following LastEvaluatedKey.
+        """
+        if not requests:
+            return
+        
+        pages: asyncio.Queue = asyncio.Queue(maxsize=len(requests) * 2)
+        request_done = object()
+        
+        aws = get_aws()
+        # The shared client is thread-safe, so concurrent requests can all use it
+        read_page = getattr(aws.dynamodb_client, operation)
+        
+        async def read(request_kwargs: Dict[str, Any]):
+            request_kwargs['TableName'] = aws.settings.CLASSES_TABLE_NAME
+            
+            try:
+                while True:
+                    response = await run_aws(read_page, **request_kwargs)
+                    await pages.put(response.get('Items', []))
+                    
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    request_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            except Exception as e:
+                await pages.put(e)
+            else:
+                await pages.put(request_done)
+        
+        tasks = [asyncio.ensure_future(read(request_kwargs)) for request_kwargs in requests]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                page = await pages.get()
+                if page is request_done:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                elif page:
+                    yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    async def expire_closed_terms() -> Dict[str, Any]:
+        """
+        Set an expires_at TTL on classes from terms whose registration has
+        closed, and on the mappings of the users tracking them.
+        
+        Classes and mappings created while their term was in the calendar
+        already carry one; this backfills those added before the term was
+        configured, so no mapping outlives its class.
+        """
+        aws = get_aws()
+        client = aws.dynamodb_client
+        expired = 0
+        mappings_expired = 0
+        
+        for term in terms.closed_terms():
+            expires_at = terms.expires_at(term)
+            query_kwargs = {
+                'TableName': aws.settings.CLASSES_TABLE_NAME,
+                'IndexName': 'semester-year-index',
+                'KeyConditionExpression': "semester = :semester AND #year = :year",
+                'ProjectionExpression': "class_id, expires_at",
+                'ExpressionAttributeNames': {'#year': 'year'},
+                'ExpressionAttributeValues': {':semester': term.semester, ':year': term.year}
+            }
+            while True:
+                response = await run_aws(client.query, **query_kwargs)
+                for item in response.get('Items', []):
+                    if 'expires_at' not in item:
+                        await run_aws(
+                            client.update_item,
+                            TableName=aws.settings.CLASSES_TABLE_NAME,
+                            Key={'class_id': item['class_id']},
+                            UpdateExpression="SET expires_at = :expires_at",
+                            ExpressionAttributeValues={':expires_at': expires_at}
+                        )
+                        expired += 1
+                    mappings_expired += await CourseService.expire_mappings(item['class_id'], expires_at)
+                
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        logger.info(f"Set expires_at on {expired} classes and {mappings_expired} mappings from closed terms")
+        return {
+            'message': f'Scheduled {expired} classes from closed terms for expiry',
+            'classes_expired': expired,
+            'mappings_expired': mappings_expired
+        }
+    
+    @staticmethod
+    async def expire_mappings(class_id: str, expires_at: int) -> int:
+        """Set expires_at on a class's mappings that don't have one yet"""
+        aws = get_aws()
+        client = aws.dynamodb_client
+        table_name = aws.settings.USER_COURSES_TABLE_NAME
+        query_kwargs = {
+            'TableName': table_name,
+            'IndexName': 'class-users-index',
+            'KeyConditionExpression': "class_id = :class_id",
+            'FilterExpression': "attribute_not_exists(expires_at)",
+            'ProjectionExpression': "user_id",
+            'ExpressionAttributeValues': {':class_id': class_id}
+        }
+        
+        expired = 0
+        while True:
+            response = await run_aws(client.query, **query_kwargs)
+            for item in response.get('Items', []):
+                try:
+                    await run_aws(
+                        client.update_item,
+                        TableName=table_name,
+                        Key={'user_id': item['user_id'], 'class_id': class_id},
+                        UpdateExpression="SET expires_at = :expires_at",
+                        # The user may have stopped tracking it since the query
+                        ConditionExpression="attribute_exists(user_id)",
+                        ExpressionAttributeValues={':expires_at': expires_at}
+                    )
+                except botocore.exceptions.ClientError as e:
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+                    continue
+                expired += 1
+            
+            if 'LastEvaluatedKey' not in response:
+                return expired
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    @staticmethod
+    async def fetch_term_availability(courses: List[Dict[str, Any]], engine: CheckEngine) -> Dict[str, Dict[str, Any]]:
+        """Batch-scrape availability per (year, semester) and return it keyed by class_id"""
+        by_term: Dict[tuple, List[Dict[str, Any]]] = {}
+        for course in courses:
+            by_term.setdefault((int(course['year']), course['semester']), []).append(course)
+        
+        async def fetch_term(term: tuple, term_courses: List[Dict[str, Any]]):
+            year, semester = term
+            crn_availability = await asyncio.wait_for(
+                CourseScraperService.get_term_availability(
+                    [course['crn'] for course in term_courses], year, semester
+                ),
+                timeout=engine.timeout
+            )
+            return {
+                course['class_id']: crn_availability[str(course['crn'])]
+                for course in term_courses
+                if str(course['crn']) in crn_availability
+            }
+        
+        term_results = await asyncio.gather(
+            *(fetch_term(term, term_courses) for term, term_courses in by_term.items()),
+            return_exceptions=True
+        )
+        
+        availability = {}
+        for term, result in zip(by_term, term_results):
+            if isinstance(result, Exception):
+                # Classes of this term fall back to per-class checks
+                logger.error(f"Batch check failed for term {term}: {result!r}")
+                continue
+            availability.update(result)
+        
+        return availability
         
     @staticmethod
     async def notify_users_for_open_courses():
         """Notify users when their tracked courses become available"""
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-        users_table = dynamodb.Table(os.environ.get('USERS_TABLE_NAME', 'Course-Users'))
-        classes_table = dynamodb.Table(os.environ.get('CLASSES_TABLE_NAME', 'Course-Classes'))
-        user_courses_table = dynamodb.Table(os.environ.get('USER_COURSES_TABLE_NAME', 'Course-UserCourses'))
+        aws = get_aws()
+        
+        cycle = metrics.current_cycle() or metrics.start_cycle()
         
         # First check all courses
-        course_results = await CourseService.check_all_courses()
+        with metrics.timer('notify.check_cycle'):
+            course_results, courses = await CourseService.shared_check_cycle()
         
-        # Filter for courses that are now open and have changed status
+        # Filter for courses that are now open and have changed status; the
+        # classes were already read by the check cycle
         newly_open_courses = [result for result in course_results 
-                            if result['is_open'] and result['status_changed']]
+                            if result['is_open'] and result['status_changed']
+                            and result['class_id'] in courses]
         
-        if not newly_open_courses:
-            return {'message': 'No newly opened courses found'}
+        # Only one run ever sees an opening, so notifications earlier runs
+        # failed to send are picked up from the ledger rather than re-detected
+        with metrics.timer('notify.ledger'):
+            retries = await NotificationService.claim_pending_notifications()
         
-        # For each newly open course, find users tracking it and notify them
-        notifications_sent = 0
+        if not newly_open_courses and not retries:
+            return {'message': 'No newly opened courses found', 'metrics': cycle.as_dict()}
         
-        for course_result in newly_open_courses:
-            class_id = course_result['class_id']
-            
-            # Get the class details
-            class_response = classes_table.get_item(
-                Key={'class_id': class_id}
-            )
-            
-            if 'Item' not in class_response:
-                continue
-                
-            course_data = class_response['Item']
-            
-            # Find users tracking this class
-            user_courses_response = user_courses_table.query(
-                IndexName='class-users-index',
-                KeyConditionExpression="class_id = :class_id",
-                ExpressionAttributeValues={
-                    ':class_id': class_id
-                }
+        # Find users tracking each newly open class
+        with metrics.timer('notify.find_watchers'):
+            watcher_lists = await asyncio.gather(*(
+                CourseService.get_class_watchers(result['class_id'])
+                for result in newly_open_courses
+            ))
+        watchers = {
+            result['class_id']: user_ids
+            for result, user_ids in zip(newly_open_courses, watcher_lists)
+        }
+        
+        # Look every user up once, however many of their classes opened
+        user_ids = {user_id for user_ids in watchers.values() for user_id in user_ids}
+        metrics.incr('notify.watchers', sum(len(user_ids) for user_ids in watchers.values()))
+        metrics.incr('notify.unique_users', len(user_ids))
+        
+        with metrics.timer('notify.load_users'):
+            users = await batch_get_items(
+                aws.dynamodb_client,
+                aws.settings.USERS_TABLE_NAME,
+                [{'user_id': user_id} for user_id in user_ids],
+                projection="user_id, email"
             )
-            
-            for user_course in user_courses_response.get('Items', []):
-                user_id = user_course['user_id']
-                
-                # Get user details
-                user_response = users_table.get_item(
-                    Key={'user_id': user_id}
-                )
-                
-                if 'Item' in user_response:
-                    user = user_response['Item']
-                    user_email = user.get('email')
-                    
-                    if user_email:
-                        # Send notification
-                        NotificationService.send_course_notification(
-                            user_id=user_id,
-                            user_email=user_email,
-                            course_data=course_data
-                        )
-                        notifications_sent += 1
+        emails = {user['user_id']: user.get('email') for user in users}
+        
+        transitions = {result['class_id']: result.get('transition_id', '') for result in newly_open_courses}
+        notifications = [
+            {
+                'user_id': user_id,
+                'user_email': emails[user_id],
+                'course_data': courses[class_id],
+                'transition_id': transitions[class_id]
+            }
+            for class_id, class_watchers in watchers.items()
+            for user_id in class_watchers
+            if emails.get(user_id)
+        ]
+        
+        # Overlapping runs and retries may be notifying for the same openings
+        with metrics.timer('notify.ledger'):
+            claimed = await NotificationService.claim_notifications(notifications)
+        
+        with metrics.timer('notify.send'):
+            outcomes = await NotificationService.send_course_notifications(claimed + retries)
+        
+        failed = [outcome for outcome in outcomes if outcome['status'] != 'sent']
+        if failed:
+            # Keep what didn't go out for the next run to retry
+            await NotificationService.defer_notifications([
+                notification for notification, outcome in zip(claimed + retries, outcomes)
+                if outcome['status'] != 'sent'
+            ])
         
         return {
             'message': f'Notifications sent for {len(newly_open_courses)} newly opened courses',
-            'notifications_sent': notifications_sent
-        } 
\ No newline at end of file
+            'notifications_sent': len(outcomes) - len(failed),
+            'notifications_skipped': len(notifications) - len(claimed),
+            'notifications_retried': len(retries),
+            'notifications_failed': failed,
+            'metrics': cycle.as_dict()
+        }
+    
+    @staticmethod
+    async def get_class_watchers(class_id: str) -> List[str]:
+        """IDs of every user tracking a class, following the GSI's pagination"""
+        aws = get_aws()
+        # Clients are thread-safe, unlike resources, so concurrent lookups share it
+        client = aws.dynamodb_client
+        query_kwargs = {
+            'TableName': aws.settings.USER_COURSES_TABLE_NAME,
+            'IndexName': 'class-users-index',
+            'KeyConditionExpression': "class_id = :class_id",
+            'ProjectionExpression': "user_id",
+            'ExpressionAttributeValues': {
+                ':class_id': class_id
+            }
+        }
+        
+        user_ids = []
+        while True:
+            response = await run_aws(client.query, **query_kwargs)
+            user_ids.extend(item['user_id'] for item in response.get('Items', []))
+            
+            if 'LastEvaluatedKey' not in response:
+                return user_ids
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
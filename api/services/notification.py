@@ -1,97 +1,596 @@
-import boto3
+import asyncio
+import botocore.exceptions
 import json
-import os
 import logging
-from typing import Dict, Any, List
+import time
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from core import metrics
+from core.config import get_settings
+from repositories.aws import get_aws, run_aws
 
 logger = logging.getLogger(__name__)
 
+# SNS's limit on entries per PublishBatch request
+PUBLISH_BATCH_MAX = 10
+
+# Ledger `delivery` of notifications that failed to send: pending ones are
+# retried by the next notify run, failed ones ran out of attempts. Sent
+# notifications have no `delivery`, which keeps the pending-index sparse
+DELIVERY_PENDING = 'pending'
+DELIVERY_FAILED = 'failed'
+
+# Parts of a class a notification needs, kept with undelivered ledger entries
+NOTIFICATION_COURSE_FIELDS = ('class_id', 'crn', 'year', 'semester')
+
+# Filter policy for subscriptions no user owns. Every publish sets user_id,
+# so this matches nothing and stops them receiving everyone's alerts
+UNMATCHED_FILTER_POLICY = json.dumps({'user_id': [{'exists': False}]})
+
+# User attribute holding the subscription ARN for each protocol
+SUBSCRIPTION_ARN_ATTRIBUTES = {
+    'email': 'email_subscription_arn',
+    'sms': 'sms_subscription_arn'
+}
+
+
+def _json_default(value):
+    # Numbers read from DynamoDB come back as Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 class NotificationService:
     @staticmethod
-    def send_course_notification(user_id: str, user_email: str, course_data: Dict[str, Any]):
-        """Send a notification when a course becomes available"""
-        try:
-            sns = boto3.client('sns', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-            topic_arn = os.environ.get('SNS_TOPIC_ARN')
-            
-            if not topic_arn:
-                logger.error("SNS_TOPIC_ARN not configured")
-                return
-            
-            # Create the message
+    def render_course_fragment(course_data: Dict[str, Any]) -> Dict[str, Any]:
+        """The part of a notification describing one opened class, rendered once per class"""
+        crn = course_data.get('crn')
+        term = f"{course_data.get('semester')} {course_data.get('year')}"
+        return {
+            'class_id': course_data.get('class_id'),
+            'course': {
+                'class_id': course_data.get('class_id'),
+                'crn': crn,
+                'year': course_data.get('year'),
+                'semester': course_data.get('semester')
+            },
+            'line': f"{crn} for {term}",
+            'subject': f"Course {crn} is now OPEN!"
+        }
+    
+    @staticmethod
+    def build_digest_message(user_id: str, user_email: str, fragments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """One SNS message telling a user about every class of theirs that opened"""
+        if len(fragments) == 1:
+            fragment = fragments[0]
             message = {
                 'user_id': user_id,
                 'email': user_email,
-                'course': {
-                    'class_id': course_data.get('class_id'),
-                    'crn': course_data.get('crn'),
-                    'year': course_data.get('year'),
-                    'semester': course_data.get('semester')
-                },
-                'message': f"Good news! Your tracked course {course_data.get('crn')} for {course_data.get('semester')} {course_data.get('year')} is now OPEN for registration."
+                'course': fragment['course'],
+                'courses': [fragment['course']],
+                'message': f"Good news! Your tracked course {fragment['line']} is now OPEN for registration."
             }
+            subject = fragment['subject']
+        else:
+            lines = "\n".join(f"- {fragment['line']}" for fragment in fragments)
+            message = {
+                'user_id': user_id,
+                'email': user_email,
+                'courses': [fragment['course'] for fragment in fragments],
+                'message': f"Good news! {len(fragments)} of your tracked courses are now OPEN for registration:\n{lines}"
+            }
+            subject = f"{len(fragments)} of your courses are now OPEN!"
+        
+        message_attributes = {
+            'user_id': {
+                'DataType': 'String',
+                'StringValue': user_id
+            }
+        }
+        if len(fragments) == 1:
+            message_attributes['course_id'] = {
+                'DataType': 'String',
+                'StringValue': fragments[0]['class_id']
+            }
+        else:
+            message_attributes['course_ids'] = {
+                'DataType': 'String.Array',
+                'StringValue': json.dumps([fragment['class_id'] for fragment in fragments])
+            }
+        
+        return {
+            'Message': json.dumps(message, default=_json_default),
+            'Subject': subject,
+            'MessageAttributes': message_attributes
+        }
+    
+    @staticmethod
+    async def send_course_notifications(notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many course notifications with SNS PublishBatch.
+        
+        Each notification is a dict with user_id, user_email and course_data.
+        A user with several opened classes gets one digest message covering all
+        of them; each class's part of the message is rendered once and shared
+        by every watcher. Messages go out in batches of 10, several batches at
+        a time, off the event loop. Entries a batch fails to publish are
+        retried one by one.
+        
+        Returns one outcome per notification, in the same order, with its
+        user_id, class_id, status ('sent' or 'failed') and the message_id of
+        its digest or error.
+        """
+        if not notifications:
+            return []
+        
+        aws = get_aws()
+        topic_arn = aws.sns_topic_arn
+        if not topic_arn:
+            logger.error("SNS_TOPIC_ARN not configured")
+            return [
+                NotificationService.outcome(notification, error="SNS_TOPIC_ARN not configured")
+                for notification in notifications
+            ]
+        
+        sns = aws.sns
+        semaphore = asyncio.Semaphore(max(1, get_settings().SNS_PUBLISH_CONCURRENCY))
+        
+        fragments: Dict[str, Dict[str, Any]] = {}
+        digests: Dict[str, List[int]] = {}
+        for index, notification in enumerate(notifications):
+            class_id = notification['course_data'].get('class_id')
+            if class_id not in fragments:
+                fragments[class_id] = NotificationService.render_course_fragment(notification['course_data'])
+            digests.setdefault(notification['user_id'], []).append(index)
+        
+        recipients = list(digests.values())
+        messages = [
+            NotificationService.build_digest_message(
+                notifications[indexes[0]]['user_id'],
+                notifications[indexes[0]]['user_email'],
+                [fragments[notifications[index]['course_data'].get('class_id')] for index in indexes]
+            )
+            for indexes in recipients
+        ]
+        
+        async def publish_one(digest: int) -> Tuple[Optional[str], Optional[str]]:
+            try:
+                response = await run_aws(sns.publish, TopicArn=topic_arn, **messages[digest])
+            except Exception as e:
+                logger.error(f"Error sending SNS notification to {notifications[recipients[digest][0]]['user_id']}: {e}")
+                return None, str(e)
+            return response.get('MessageId'), None
+        
+        async def publish_batch(batch: List[int]) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+            async with semaphore:
+                results: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+                try:
+                    response = await run_aws(
+                        sns.publish_batch,
+                        TopicArn=topic_arn,
+                        PublishBatchRequestEntries=[{'Id': str(digest), **messages[digest]} for digest in batch]
+                    )
+                except Exception as e:
+                    logger.warning(f"SNS PublishBatch of {len(batch)} messages failed, retrying individually: {e}")
+                    retry = batch
+                else:
+                    for entry in response.get('Successful', []):
+                        results[int(entry['Id'])] = (entry.get('MessageId'), None)
+                    
+                    failed = response.get('Failed', [])
+                    if failed:
+                        logger.warning(f"{len(failed)} SNS batch entries failed, retrying individually, e.g. {failed[0]}")
+                    retry = [digest for digest in batch if digest not in results]
+                
+                metrics.incr('notify.retried', len(retry))
+                for result, digest in zip(await asyncio.gather(*(publish_one(digest) for digest in retry)), retry):
+                    results[digest] = result
+                
+                return results
+        
+        batches = [
+            list(range(i, min(i + PUBLISH_BATCH_MAX, len(messages))))
+            for i in range(0, len(messages), PUBLISH_BATCH_MAX)
+        ]
+        results: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        for batch_results in await asyncio.gather(*(publish_batch(batch) for batch in batches)):
+            results.update(batch_results)
+        
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(notifications)
+        for digest, indexes in enumerate(recipients):
+            message_id, error = results[digest]
+            for index in indexes:
+                outcomes[index] = NotificationService.outcome(notifications[index], message_id=message_id, error=error)
+        
+        sent = sum(1 for outcome in outcomes if outcome['status'] == 'sent')
+        messages_sent = sum(1 for message_id, error in results.values() if error is None)
+        metrics.incr('notify.sent', sent)
+        metrics.incr('notify.failed', len(outcomes) - sent)
+        metrics.incr('notify.messages', messages_sent)
+        logger.info(f"SNS notifications sent: {sent} in {messages_sent} messages, failed: {len(outcomes) - sent}")
+        
+        return outcomes
+    
+    @staticmethod
+    def ledger_id(notification: Dict[str, Any]) -> str:
+        """Ledger key for one user being told about one opening of one class"""
+        return f"{notification['user_id']}#{notification['course_data'].get('class_id')}#{notification.get('transition_id', '')}"
+    
+    @staticmethod
+    async def claim_notifications(notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Record notifications in the ledger and return only those not already there.
+        
+        Each claim is a conditional put, so when runs overlap exactly one of
+        them gets to send each notification. Entries expire after
+        NOTIFICATION_LEDGER_TTL_DAYS through the table's TTL.
+        """
+        if not notifications:
+            return []
+        
+        settings = get_settings()
+        aws = get_aws()
+        client = aws.dynamodb_client
+        table_name = aws.settings.NOTIFICATION_LEDGER_TABLE_NAME
+        now = time.time()
+        expires_at = int(now + settings.NOTIFICATION_LEDGER_TTL_DAYS * 86400)
+        semaphore = asyncio.Semaphore(max(1, settings.NOTIFICATION_LEDGER_CONCURRENCY))
+        
+        async def claim(notification: Dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    await run_aws(
+                        client.put_item,
+                        TableName=table_name,
+                        Item={
+                            'ledger_id': NotificationService.ledger_id(notification),
+                            'user_id': notification['user_id'],
+                            'class_id': notification['course_data'].get('class_id'),
+                            'claimed_at': int(now),
+                            'expires_at': expires_at
+                        },
+                        ConditionExpression="attribute_not_exists(ledger_id)"
+                    )
+                except botocore.exceptions.ClientError as e:
+                    if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                        return False
+                    raise
+                return True
+        
+        claims = await asyncio.gather(*(claim(notification) for notification in notifications))
+        claimed = [notification for notification, won in zip(notifications, claims) if won]
+        
+        metrics.incr('notify.duplicates_skipped', len(notifications) - len(claimed))
+        return claimed
+    
+    @staticmethod
+    async def defer_notifications(notifications: List[Dict[str, Any]]):
+        """
+        Keep notifications that failed to send in the ledger as pending, with
+        everything needed to send them again, so a later notify run retries
+        them. After NOTIFICATION_MAX_ATTEMPTS they are marked failed instead.
+        """
+        settings = get_settings()
+        aws = get_aws()
+        client = aws.dynamodb_client
+        table_name = aws.settings.NOTIFICATION_LEDGER_TABLE_NAME
+        
+        async def defer(notification: Dict[str, Any]):
+            attempts = notification.get('attempts', 0) + 1
+            delivery = DELIVERY_PENDING if attempts < settings.NOTIFICATION_MAX_ATTEMPTS else DELIVERY_FAILED
+            if delivery == DELIVERY_FAILED:
+                logger.error(f"Giving up on notification {NotificationService.ledger_id(notification)} after {attempts} attempts")
             
-            # Publish the message to SNS
-            response = sns.publish(
-                TopicArn=topic_arn,
-                Message=json.dumps(message),
-                Subject=f"Course {course_data.get('crn')} is now OPEN!",
-                MessageAttributes={
-                    'user_id': {
-                        'DataType': 'String',
-                        'StringValue': user_id
-                    },
-                    'course_id': {
-                        'DataType': 'String',
-                        'StringValue': course_data.get('class_id')
-                    }
+            course_data = notification['course_data']
+            await run_aws(
+                client.update_item,
+                TableName=table_name,
+                Key={'ledger_id': NotificationService.ledger_id(notification)},
+                UpdateExpression=(
+                    "SET delivery = :delivery, attempts = :attempts, user_email = :user_email, "
+                    "course_data = :course_data, transition_id = :transition_id"
+                ),
+                ExpressionAttributeValues={
+                    ':delivery': delivery,
+                    ':attempts': attempts,
+                    ':user_email': notification['user_email'],
+                    ':course_data': {name: course_data[name] for name in NOTIFICATION_COURSE_FIELDS if name in course_data},
+                    ':transition_id': notification.get('transition_id', '')
                 }
             )
-            
-            logger.info(f"SNS notification sent. MessageId: {response.get('MessageId')}")
-            return response
-            
-        except Exception as e:
-            logger.error(f"Error sending SNS notification: {e}")
-            raise e
+        
+        results = await asyncio.gather(*(defer(notification) for notification in notifications), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error recording undelivered notification: {result!r}")
+    
+    @staticmethod
+    async def claim_pending_notifications() -> List[Dict[str, Any]]:
+        """
+        Take the notifications earlier runs failed to send off the ledger's
+        pending-index so this run can send them again.
+        
+        Each entry is claimed with a conditional update, so when runs overlap
+        only one of them resends it.
+        """
+        aws = get_aws()
+        client = aws.dynamodb_client
+        table_name = aws.settings.NOTIFICATION_LEDGER_TABLE_NAME
+        
+        query_kwargs = {
+            'TableName': table_name,
+            'IndexName': 'pending-index',
+            'KeyConditionExpression': "delivery = :pending",
+            'ExpressionAttributeValues': {':pending': DELIVERY_PENDING}
+        }
+        pending = []
+        while True:
+            response = await run_aws(client.query, **query_kwargs)
+            pending.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        semaphore = asyncio.Semaphore(max(1, get_settings().NOTIFICATION_LEDGER_CONCURRENCY))
+        
+        async def claim(item: Dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    await run_aws(
+                        client.update_item,
+                        TableName=table_name,
+                        Key={'ledger_id': item['ledger_id']},
+                        UpdateExpression="REMOVE delivery",
+                        ConditionExpression="delivery = :pending",
+                        ExpressionAttributeValues={':pending': DELIVERY_PENDING}
+                    )
+                except botocore.exceptions.ClientError as e:
+                    if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                        return False
+                    raise
+                return True
+        
+        claims = await asyncio.gather(*(claim(item) for item in pending))
+        retries = [
+            {
+                'user_id': item['user_id'],
+                'user_email': item['user_email'],
+                'course_data': item['course_data'],
+                'transition_id': item.get('transition_id', ''),
+                'attempts': int(item.get('attempts', 0))
+            }
+            for item, won in zip(pending, claims) if won
+        ]
+        
+        metrics.incr('notify.retries_claimed', len(retries))
+        return retries
+    
+    @staticmethod
+    def outcome(
+        notification: Dict[str, Any],
+        message_id: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Per-message result of send_course_notifications"""
+        outcome = {
+            'user_id': notification['user_id'],
+            'class_id': notification['course_data'].get('class_id'),
+            'status': 'failed' if error else 'sent'
+        }
+        if error:
+            outcome['error'] = error
+        else:
+            outcome['message_id'] = message_id
+        return outcome
     
     @staticmethod
-    def subscribe_user_to_notifications(email: str, phone_number: str = None):
-        """Subscribe a user to the SNS topic for notifications"""
+    def filter_policy(user_id: str) -> str:
+        """Subscription filter policy that only delivers messages addressed to `user_id`"""
+        return json.dumps({'user_id': [user_id]})
+    
+    @staticmethod
+    async def subscribe_user_to_notifications(user_id: str, email: str, phone_number: str = None):
+        """
+        Subscribe a user to their own notifications on the SNS topic.
+        
+        Each subscription carries a filter policy on the user_id message
+        attribute, so it only receives that user's alerts. Subscription ARNs are
+        stored on the user's item; endpoints with a confirmed subscription are
+        not subscribed again, and a changed endpoint replaces the old
+        subscription. A stored subscription that is still pending confirmation
+        or has been deleted is subscribed again, which resends the confirmation.
+        """
         try:
-            sns = boto3.client('sns', region_name=os.environ.get('AWS_REGION_NAME', 'us-east-1'))
-            topic_arn = os.environ.get('SNS_TOPIC_ARN')
+            aws = get_aws()
+            sns = aws.sns
+            topic_arn = aws.sns_topic_arn
             
             if not topic_arn:
                 logger.error("SNS_TOPIC_ARN not configured")
                 return
             
-            # Subscribe email to the topic
-            if email:
-                email_response = sns.subscribe(
+            client = aws.dynamodb_client
+            users_table_name = aws.settings.USERS_TABLE_NAME
+            user = (await run_aws(client.get_item, TableName=users_table_name, Key={'user_id': user_id})).get('Item', {})
+            
+            updates = {}
+            subscribed = []
+            for protocol, endpoint_attribute, endpoint in (('email', 'email', email), ('sms', 'phone_number', phone_number)):
+                if not endpoint:
+                    continue
+                
+                arn_attribute = SUBSCRIPTION_ARN_ATTRIBUTES[protocol]
+                subscription_arn = user.get(arn_attribute)
+                if user.get(endpoint_attribute) == endpoint and subscription_arn:
+                    # SNS returns an ARN before the endpoint confirms, so only a
+                    # confirmed subscription counts as already subscribed
+                    if await NotificationService.subscription_confirmed(subscription_arn):
+                        continue
+                elif subscription_arn:
+                    # The endpoint changed; stop delivering to the old one
+                    await NotificationService.unsubscribe(subscription_arn)
+                
+                response = await run_aws(
+                    sns.subscribe,
                     TopicArn=topic_arn,
-                    Protocol='email',
-                    Endpoint=email
+                    Protocol=protocol,
+                    Endpoint=endpoint,
+                    Attributes={'FilterPolicy': NotificationService.filter_policy(user_id)},
+                    ReturnSubscriptionArn=True
                 )
                 
-                logger.info(f"Email subscription created. SubscriptionArn: {email_response.get('SubscriptionArn')}")
+                logger.info(f"{protocol} subscription created. SubscriptionArn: {response.get('SubscriptionArn')}")
+                updates[endpoint_attribute] = endpoint
+                updates[arn_attribute] = response['SubscriptionArn']
+                subscribed.append(protocol)
             
-            # Subscribe phone number to the topic if provided
-            if phone_number:
-                phone_response = sns.subscribe(
-                    TopicArn=topic_arn,
-                    Protocol='sms',
-                    Endpoint=phone_number
+            if updates:
+                await run_aws(
+                    client.update_item,
+                    TableName=users_table_name,
+                    Key={'user_id': user_id},
+                    UpdateExpression="SET " + ", ".join(f"{name} = :{name}" for name in updates),
+                    ExpressionAttributeValues={f":{name}": value for name, value in updates.items()}
                 )
-                
-                logger.info(f"SMS subscription created. SubscriptionArn: {phone_response.get('SubscriptionArn')}")
             
             return {
-                'message': 'Subscriptions created successfully',
+                'message': 'Subscriptions created successfully' if subscribed else 'Already subscribed',
                 'email': email,
-                'phone_number': phone_number
+                'phone_number': phone_number,
+                'subscribed': subscribed
             }
             
         except Exception as e:
             logger.error(f"Error creating subscriptions: {e}")
-            raise e 
\ No newline at end of file
+            raise e
+    
+    @staticmethod
+    async def subscription_confirmed(subscription_arn: str) -> bool:
+        """Whether the subscription still exists and its endpoint has confirmed it"""
+        try:
+            response = await run_aws(
+                get_aws().sns.get_subscription_attributes,
+                SubscriptionArn=subscription_arn
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] not in ('NotFound', 'InvalidParameter'):
+                raise
+            return False
+        return response.get('Attributes', {}).get('PendingConfirmation') != 'true'
+    
+    @staticmethod
+    async def unsubscribe(subscription_arn: str):
+        """Remove a subscription, ignoring ones that are gone or were never confirmed"""
+        try:
+            await run_aws(get_aws().sns.unsubscribe, SubscriptionArn=subscription_arn)
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] not in ('NotFound', 'InvalidParameter'):
+                raise
+            logger.warning(f"Could not unsubscribe {subscription_arn}: {e.response['Error']['Message']}")
+    
+    @staticmethod
+    async def migrate_subscriptions(cognito=None) -> Dict[str, Any]:
+        """
+        Add user_id filter policies to subscriptions created before they existed.
+        
+        Each confirmed subscription on the topic is matched to a user by its
+        endpoint, first through the Users table and then, when `cognito` is
+        given, through the user pool. Matched subscriptions get the user's
+        filter policy and their ARN is stored on the user. Unmatched ones get
+        a filter policy that matches nothing, so they stop receiving every
+        user's alerts. Unconfirmed subscriptions can't be changed and are only
+        counted; run this again once they are confirmed. Safe to re-run.
+        """
+        aws = get_aws()
+        sns = aws.sns
+        topic_arn = aws.sns_topic_arn
+        
+        if not topic_arn:
+            logger.error("SNS_TOPIC_ARN not configured")
+            return
+        
+        client = aws.dynamodb_client
+        users_table_name = aws.settings.USERS_TABLE_NAME
+        
+        # Endpoints already known from the Users table
+        owners: Dict[str, str] = {}
+        scan_kwargs = {'TableName': users_table_name, 'ProjectionExpression': "user_id, email, phone_number"}
+        while True:
+            response = await run_aws(client.scan, **scan_kwargs)
+            for user in response.get('Items', []):
+                for endpoint_attribute in ('email', 'phone_number'):
+                    if user.get(endpoint_attribute):
+                        owners[user[endpoint_attribute]] = user['user_id']
+            
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        migrated = 0
+        pending = 0
+        unmatched = []
+        
+        pages = iter(sns.get_paginator('list_subscriptions_by_topic').paginate(TopicArn=topic_arn))
+        while True:
+            # Each page is a separate request, so fetch them one at a time off the event loop
+            page = await run_aws(next, pages, None)
+            if page is None:
+                break
+            
+            for subscription in page.get('Subscriptions', []):
+                protocol = subscription.get('Protocol')
+                endpoint = subscription.get('Endpoint')
+                subscription_arn = subscription.get('SubscriptionArn')
+                
+                if protocol not in SUBSCRIPTION_ARN_ATTRIBUTES:
+                    continue
+                if not subscription_arn or not subscription_arn.startswith('arn:'):
+                    # Pending confirmation; attributes can't be set until confirmed
+                    pending += 1
+                    continue
+                
+                user_id = owners.get(endpoint)
+                if user_id is None and cognito is not None:
+                    user_id = await run_aws(
+                        cognito.find_username, 'email' if protocol == 'email' else 'phone_number', endpoint
+                    )
+                if user_id is None:
+                    await run_aws(
+                        sns.set_subscription_attributes,
+                        SubscriptionArn=subscription_arn,
+                        AttributeName='FilterPolicy',
+                        AttributeValue=UNMATCHED_FILTER_POLICY
+                    )
+                    unmatched.append(subscription_arn)
+                    continue
+                
+                await run_aws(
+                    sns.set_subscription_attributes,
+                    SubscriptionArn=subscription_arn,
+                    AttributeName='FilterPolicy',
+                    AttributeValue=NotificationService.filter_policy(user_id)
+                )
+                
+                endpoint_attribute = 'email' if protocol == 'email' else 'phone_number'
+                arn_attribute = SUBSCRIPTION_ARN_ATTRIBUTES[protocol]
+                await run_aws(
+                    client.update_item,
+                    TableName=users_table_name,
+                    Key={'user_id': user_id},
+                    UpdateExpression=f"SET {endpoint_attribute} = :endpoint, {arn_attribute} = :arn",
+                    ExpressionAttributeValues={':endpoint': endpoint, ':arn': subscription_arn}
+                )
+                migrated += 1
+        
+        logger.info(f"Migrated {migrated} subscriptions; {pending} pending, {len(unmatched)} unmatched and silenced")
+        message = f'Added filter policies to {migrated} subscriptions and silenced {len(unmatched)} unmatched ones'
+        if pending:
+            message += f'. {pending} subscriptions are pending confirmation and still receive every alert once confirmed; re-run after they are confirmed'
+        return {
+            'message': message,
+            'migrated': migrated,
+            'pending_confirmation': pending,
+            'unmatched': unmatched
+        }
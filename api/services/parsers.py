@@ -0,0 +1,163 @@
+import html
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Row ids embed the CRN, e.g. "row-12345"
+_CRN_TOKEN = re.compile(r'\d+')
+
+
+class CourseListingParser(ABC):
+    """Extracts course availability for a set of CRNs from a registration page"""
+
+    name = "base"
+
+    @abstractmethod
+    def parse(self, page: str, crns: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return availability for each requested CRN found on the page; missing CRNs are omitted"""
+
+    @staticmethod
+    def availability(status_text: str, seats_text: str) -> Dict[str, Any]:
+        is_open = False
+        seats_available = 0
+
+        if status_text is not None:
+            is_open = "open" in status_text.strip().lower()
+
+        if seats_text is not None:
+            try:
+                seats_available = int(seats_text.strip())
+            except ValueError:
+                seats_available = 0
+
+        return {
+            "is_open": is_open,
+            "seats_available": seats_available
+        }
+
+
+class SoupListingParser(CourseListingParser):
+    """Builds a full BeautifulSoup tree; slow but tolerant of any markup"""
+
+    name = "soup"
+
+    def parse(self, page: str, crns: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        wanted = {str(crn) for crn in crns}
+        soup = BeautifulSoup(page, 'html.parser')
+
+        results = {}
+        for course_row in soup.find_all('tr', id=True):
+            for token in _CRN_TOKEN.findall(course_row['id']):
+                if token in wanted and token not in results:
+                    results[token] = self.parse_course_row(course_row)
+
+        return results
+
+    def parse_course_row(self, course_row) -> Dict[str, Any]:
+        # Look for indicators of course availability
+        # This is just an example - adjust to match your university's website
+        status_cell = course_row.find('td', {'class': 'status'})
+        seats_cell = course_row.find('td', {'class': 'seats'})
+
+        return self.availability(
+            status_cell.text if status_cell else None,
+            seats_cell.text if seats_cell else None
+        )
+
+
+class FastListingParser(CourseListingParser):
+    """
+    Scans the raw page for the rows of the requested CRNs and reads only their
+    status and seats cells, without building a document tree. Stops as soon
+    as every requested CRN has been found.
+    """
+
+    name = "fast"
+
+    _ROW = re.compile(r'<tr\b[^>]*?\sid\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+    _ROW_END = re.compile(r'</tr\s*>|<tr\b', re.IGNORECASE)
+    _CELL = (
+        r'<td\b[^>]*?\sclass\s*=\s*'
+        r'(?:"(?:[^"]*\s)?{0}(?:\s[^"]*)?"|\'(?:[^\']*\s)?{0}(?:\s[^\']*)?\'|{0}(?=[\s>]))'
+        r'[^>]*>(.*?)</td\s*>'
+    )
+    _STATUS_CELL = re.compile(_CELL.format('status'), re.IGNORECASE | re.DOTALL)
+    _SEATS_CELL = re.compile(_CELL.format('seats'), re.IGNORECASE | re.DOTALL)
+    _TAG = re.compile(r'<[^>]+>')
+
+    def parse(self, page: str, crns: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        wanted = {str(crn) for crn in crns}
+
+        results = {}
+        for row_match in self._ROW.finditer(page):
+            row_id = next(group for group in row_match.groups() if group is not None)
+            matched = [
+                token for token in _CRN_TOKEN.findall(row_id)
+                if token in wanted and token not in results
+            ]
+            if not matched:
+                continue
+
+            row_end = self._ROW_END.search(page, row_match.end())
+            row = page[row_match.end():row_end.start() if row_end else len(page)]
+
+            availability = self.availability(
+                self._cell_text(self._STATUS_CELL, row),
+                self._cell_text(self._SEATS_CELL, row)
+            )
+            for token in matched:
+                results[token] = availability
+
+            if len(results) == len(wanted):
+                break
+
+        return results
+
+    def _cell_text(self, cell_pattern: re.Pattern, row: str):
+        cell = cell_pattern.search(row)
+        if not cell:
+            return None
+        return html.unescape(self._TAG.sub('', cell.group(1)))
+
+
+_PARSERS = {
+    parser.name: parser
+    for parser in (FastListingParser(), SoupListingParser())
+}
+
+
+def get_parser(name: str) -> CourseListingParser:
+    """Look up a parser by name, falling back to the BeautifulSoup parser"""
+    parser = _PARSERS.get(name)
+    if parser is None:
+        logger.warning(f"Unknown scraper parser '{name}', using 'soup'")
+        parser = _PARSERS["soup"]
+    return parser
+
+
+def parse_listing(page: str, crns: Iterable[str], parser_name: str = "fast") -> Dict[str, Dict[str, Any]]:
+    """
+    Parse the requested CRNs out of a page with the configured parser.
+
+    If the configured parser finds none of the CRNs, the page is parsed again
+    with the BeautifulSoup parser in case the markup is something the fast
+    path does not understand.
+    """
+    wanted = {str(crn) for crn in crns}
+    parser = get_parser(parser_name)
+
+    try:
+        results = parser.parse(page, wanted)
+    except Exception as e:
+        logger.error(f"Parser '{parser.name}' failed, falling back to 'soup': {e}")
+        results = {}
+
+    if not results and wanted and parser.name != "soup":
+        results = _PARSERS["soup"].parse(page, wanted)
+
+    return results
@@ -0,0 +1,223 @@
+import heapq
+import logging
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from core import metrics, terms
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """
+    Decides how often each class is checked and which classes a run checks.
+
+    Every class gets a polling interval scaled from the base interval by:
+    - watchers: more watchers poll more often
+    - recent changes: a class that just changed state is likely to change again
+    - registration milestones: poll faster near a term's open and close
+      dates, and slower the further away its registration is
+    - seat volatility: classes whose seat counts move a lot poll more often
+
+    The interval decides the class's next_check_at. Each run checks only the
+    classes that are due, most overdue first, up to `budget` classes.
+    """
+
+    # Recent seat movement counts half as much after this many hours
+    VOLATILITY_HALF_LIFE_HOURS = 24.0
+
+    # Days either side of a term's open/close dates that count as busy
+    MILESTONE_WINDOW_DAYS = 3
+
+    def __init__(
+        self,
+        base_interval: float = 180.0,
+        min_interval: float = 60.0,
+        max_interval: float = 21600.0,
+        budget: int = 500,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.budget = budget
+
+    @classmethod
+    def from_settings(cls) -> 'PollScheduler':
+        settings = get_settings()
+        return cls(
+            base_interval=settings.SCHEDULER_BASE_INTERVAL_SECONDS,
+            min_interval=settings.SCHEDULER_MIN_INTERVAL_SECONDS,
+            max_interval=settings.SCHEDULER_MAX_INTERVAL_SECONDS,
+            budget=settings.SCHEDULER_BUDGET_PER_RUN
+        )
+
+    def interval(self, course: Dict[str, Any], now: datetime) -> float:
+        """Seconds until `course` should be checked again"""
+        milestone = self.milestone_factor(course, now)
+        if milestone is None:
+            return self.max_interval
+
+        interval = (
+            self.base_interval
+            * self.watcher_factor(course)
+            * self.recency_factor(course, now)
+            * milestone
+            * self.volatility_factor(course, now)
+        )
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def next_check_at(self, course: Dict[str, Any], now: datetime) -> str:
+        return (now + timedelta(seconds=self.interval(course, now))).isoformat()
+
+    def select(self, courses: Iterable[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+        """Pick the due classes to check this run, most overdue relative to their interval first"""
+        selection = self.selection(now)
+        selection.add(courses)
+        return selection.result()
+
+    def selection(self, now: datetime) -> 'DueSelection':
+        """Collect candidates page by page, keeping only the `budget` most overdue"""
+        return DueSelection(self, now)
+
+    def priority(self, course: Dict[str, Any], now: datetime) -> Optional[float]:
+        """How overdue `course` is relative to its interval, or None if it isn't due"""
+        due_at = _parse_time(course.get('next_check_at'))
+        if due_at is None:
+            # Never scheduled: check before anything that merely fell behind
+            return math.inf
+        if due_at > now:
+            return None
+        return (now - due_at).total_seconds() / self.interval(course, now)
+
+    def interval_changed(self, course: Dict[str, Any], now: datetime) -> bool:
+        """
+        Whether the class's interval has moved enough since its next check was
+        stored (more than halved or doubled) that the stored schedule is stale.
+        """
+        last_checked = _parse_time(course.get('last_checked'))
+        due_at = _parse_time(course.get('next_check_at'))
+        if last_checked is None or due_at is None:
+            return True
+
+        stored = (due_at - last_checked).total_seconds()
+        if stored <= 0:
+            return True
+        ratio = self.interval(course, now) / stored
+        return ratio < 0.5 or ratio > 2.0
+
+    @staticmethod
+    def watcher_factor(course: Dict[str, Any]) -> float:
+        # Classes created before watcher counts existed are treated as having one
+        watchers = max(1, int(course.get('watcher_count') or 1))
+        return 1.0 / (1.0 + math.log2(watchers))
+
+    @staticmethod
+    def recency_factor(course: Dict[str, Any], now: datetime) -> float:
+        last_changed = _parse_time(course.get('last_changed'))
+        if last_changed is None:
+            return 1.0
+
+        age = now - last_changed
+        if age < timedelta(hours=1):
+            return 0.5
+        if age < timedelta(days=1):
+            return 0.75
+        return 1.0
+
+    @classmethod
+    def milestone_factor(cls, course: Dict[str, Any], now: datetime) -> Optional[float]:
+        """Scale for the class's registration calendar, or None once registration has closed"""
+        term = terms.find_term(course.get('semester'), course.get('year') or 0)
+        if term is None:
+            return 1.0
+
+        today = now.date()
+        if today > term.registration_closes:
+            return None
+        if today < term.registration_opens:
+            # Months away polls up to a few hours apart
+            return min(120.0, 1.0 + (term.registration_opens - today).days / 2)
+
+        days_open = (today - term.registration_opens).days
+        days_left = (term.registration_closes - today).days
+        if min(days_open, days_left) <= cls.MILESTONE_WINDOW_DAYS:
+            return 0.5
+        return 1.0
+
+    @classmethod
+    def volatility_factor(cls, course: Dict[str, Any], now: datetime) -> float:
+        volatility = cls.volatility(course, now)
+        return 1.0 / (1.0 + min(volatility, 20.0) / 5.0)
+
+    @classmethod
+    def volatility(cls, course: Dict[str, Any], now: datetime) -> float:
+        """Recent seat movement, decayed by the time since the class last changed"""
+        volatility = float(course.get('seat_volatility') or 0)
+        last_changed = _parse_time(course.get('last_changed'))
+        if not volatility or last_changed is None:
+            return volatility
+
+        hours = max(0.0, (now - last_changed).total_seconds() / 3600)
+        return volatility * 0.5 ** (hours / cls.VOLATILITY_HALF_LIFE_HOURS)
+
+    @classmethod
+    def updated_volatility(cls, course: Dict[str, Any], seat_delta: int, now: datetime) -> Decimal:
+        """Volatility to store alongside a status change of `seat_delta` seats"""
+        return Decimal(str(round(cls.volatility(course, now) + abs(seat_delta), 3)))
+
+
+class DueSelection:
+    """
+    The due classes seen so far, bounded to the scheduler's budget.
+
+    Candidates can be added a page at a time while they are still being
+    read; only the `budget` most overdue are held, in a min-heap whose root
+    is the first to be displaced.
+    """
+
+    def __init__(self, scheduler: PollScheduler, now: datetime):
+        self.scheduler = scheduler
+        self.now = now
+        self._heap: List[tuple] = []
+        self.due = 0
+        self.not_due = 0
+
+    def add(self, courses: Iterable[Dict[str, Any]]):
+        budget = self.scheduler.budget
+        for course in courses:
+            priority = self.scheduler.priority(course, self.now)
+            if priority is None:
+                self.not_due += 1
+                continue
+
+            self.due += 1
+            entry = (priority, int(course.get('watcher_count') or 0), course['class_id'], course)
+            if budget <= 0 or len(self._heap) < budget:
+                heapq.heappush(self._heap, entry)
+            elif entry > self._heap[0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def result(self) -> List[Dict[str, Any]]:
+        """The selected classes, most overdue first"""
+        selected = [entry[-1] for entry in sorted(self._heap, key=lambda entry: entry[:3], reverse=True)]
+        deferred = self.due - len(selected)
+
+        metrics.incr('classes_due', self.due)
+        metrics.incr('classes_not_due', self.not_due)
+        metrics.incr('classes_deferred', deferred)
+        if deferred:
+            logger.warning(f"Check budget of {self.scheduler.budget} reached, deferring {deferred} due classes")
+
+        return selected
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
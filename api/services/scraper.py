@@ -1,90 +1,361 @@
+import asyncio
+import hashlib
 import httpx
-from bs4 import BeautifulSoup
 import logging
-import re
-from typing import Dict, Any
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, Optional, Set
+from urllib.parse import urlparse
+
+from core.cache import LRUCache, SingleFlightCache
+from core.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from core.config import get_settings
+from core.http_client import get_http_client
+from core.rate_limiter import get_rate_limiter, parse_retry_after
+from services.parsers import parse_listing
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class CachedPage:
+    """What we remember about a fetched page to short-circuit the next fetch"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: str
+    crns: Set[str] = field(default_factory=set)
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def covers(self, crns: Set[str]) -> bool:
+        return crns <= self.crns
+
+    def results_for(self, crns: Set[str]) -> Dict[str, Dict[str, Any]]:
+        return {crn: dict(self.results[crn]) for crn in crns if crn in self.results}
+
+
+_page_cache = LRUCache(maxsize=get_settings().SCRAPER_PAGE_CACHE_SIZE)
+
+# Recent availability per class, with concurrent lookups collapsed into one scrape
+_availability_cache = SingleFlightCache(
+    maxsize=get_settings().AVAILABILITY_CACHE_SIZE,
+    ttl=get_settings().AVAILABILITY_CACHE_TTL_SECONDS
+)
+
+# Responses that mean the registration site wants us to slow down
+THROTTLE_STATUS_CODES = {429, 503}
+
+
 class CourseScraperService:
+    @staticmethod
+    def term_code(year: int, semester: str) -> str:
+        """Convert a year and semester to the term code expected by the university's system"""
+        semester_code = {
+            "Spring": "10",
+            "Summer": "20",
+            "Fall": "30"
+        }.get(semester, "30")
+
+        return f"{int(year)}{semester_code}"
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        return _page_cache.stats()
+
+    @staticmethod
+    async def request(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        GET a URL through the host's circuit breaker and shared adaptive rate limiter.
+
+        While the host's circuit is open this raises CircuitOpenError without
+        sending anything. 429 and 503 responses slow the limiter down and are
+        retried with exponential backoff, or after the host's Retry-After when
+        it sends one. Transport errors, 5xx responses and requests cancelled
+        part-way count as failures towards opening the circuit.
+        """
+        settings = get_settings()
+        host = urlparse(url).netloc
+        breaker = get_circuit_breaker(host)
+        limiter = get_rate_limiter(host)
+        client = get_http_client()
+
+        breaker.before_call()
+
+        try:
+            attempt = 0
+            while True:
+                await limiter.acquire()
+                response = await client.get(url, headers=headers)
+
+                if response.status_code not in THROTTLE_STATUS_CODES:
+                    # A server error isn't a throttle, but it isn't a sign the
+                    # host can take more either
+                    if response.status_code < 500:
+                        limiter.on_success()
+                    break
+
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                limiter.on_throttle(retry_after)
+
+                if attempt >= settings.SCRAPER_MAX_RETRIES:
+                    break
+
+                if retry_after is None:
+                    backoff = settings.SCRAPER_BACKOFF_BASE_SECONDS * (2 ** attempt)
+                    await asyncio.sleep(backoff * (0.5 + random.random() / 2))
+
+                attempt += 1
+                logger.warning(f"Retrying {url} after HTTP {response.status_code} (attempt {attempt})")
+        except BaseException:
+            # Transport errors, but also cancellation by a check timeout while
+            # waiting on the limiter or the host. Every exit has to settle the
+            # call, or a half-open probe slot is never given back
+            breaker.on_failure()
+            raise
+
+        if response.status_code >= 500 or response.status_code in THROTTLE_STATUS_CODES:
+            breaker.on_failure()
+        else:
+            breaker.on_success()
+        return response
+
+    @staticmethod
+    async def fetch_listing(url: str, crns: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch a registration page and parse the requested CRNs out of it.
+
+        The ETag, Last-Modified and a digest of the body are remembered per
+        URL. The next fetch is sent as a conditional request, and a 304 or an
+        identical body reuses the previously parsed rows instead of parsing
+        the page again.
+        """
+        wanted = {str(crn) for crn in crns}
+        cached: Optional[CachedPage] = _page_cache.get(url)
+
+        headers = {}
+        if cached and cached.covers(wanted):
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        response = await CourseScraperService.request(url, headers)
+
+        if response.status_code == 304 and headers:
+            _page_cache.record_hit()
+            return cached.results_for(wanted)
+
+        response.raise_for_status()
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if cached and cached.digest == digest and cached.covers(wanted):
+            _page_cache.record_hit()
+            cached.etag, cached.last_modified = etag, last_modified
+            return cached.results_for(wanted)
+
+        _page_cache.record_miss()
+        results = parse_listing(response.text, wanted, get_settings().SCRAPER_PARSER)
+
+        entry = CachedPage(etag=etag, last_modified=last_modified, digest=digest, crns=set(wanted), results=results)
+        if cached and cached.digest == digest:
+            # Same page, different CRNs: keep what was already parsed from it
+            entry.crns |= cached.crns
+            entry.results = {**cached.results, **results}
+        _page_cache.set(url, entry)
+
+        return {crn: dict(availability) for crn, availability in results.items()}
+
+    @staticmethod
+    def error_result(error: str, upstream_unavailable: bool = False) -> Dict[str, Any]:
+        """
+        Result for a check that could not read the course's availability.
+
+        `upstream_unavailable` marks failures of the registration site itself,
+        for which callers should keep the last known status.
+        """
+        result = {"is_open": False, "error": error}
+        if upstream_unavailable:
+            result["upstream_unavailable"] = True
+        return result
+
+    @staticmethod
+    def availability_key(crn: str, year: int, semester: str) -> str:
+        """Cache key for one class; matches the class_id format used by CourseService"""
+        return f"{crn}-{int(year)}-{getattr(semester, 'value', semester)}"
+
+    @staticmethod
+    def availability_cache_stats() -> Dict[str, Any]:
+        return _availability_cache.stats()
+
+    @staticmethod
+    async def get_course_availability(crn: str, year: int, semester: str) -> Dict[str, Any]:
+        """
+        Check a single course, using simulated data unless SCRAPER_SIMULATE is disabled.
+
+        Concurrent lookups of the same class share one scrape, and successful
+        results are cached for AVAILABILITY_CACHE_TTL_SECONDS.
+        """
+        async def load():
+            if get_settings().SCRAPER_SIMULATE:
+                return await CourseScraperService.simulate_course_availability(crn, year, semester)
+            return await CourseScraperService.check_course_availability(crn, year, semester)
+
+        availability = await _availability_cache.get_or_load(
+            CourseScraperService.availability_key(crn, year, semester),
+            load,
+            cacheable=lambda result: 'error' not in result
+        )
+        return dict(availability)
+
+    @staticmethod
+    async def get_term_availability(crns: Iterable[str], year: int, semester: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Check every CRN of a term, using simulated data unless SCRAPER_SIMULATE is disabled.
+
+        CRNs with a fresh cached result are not scraped again, and overlapping
+        requests for the same set of CRNs share one term scrape.
+        """
+        wanted = {str(crn) for crn in crns}
+        results = {}
+        for crn in wanted:
+            cached = _availability_cache.get(CourseScraperService.availability_key(crn, year, semester))
+            if cached is not None:
+                _availability_cache.cache.record_hit()
+                results[crn] = dict(cached)
+
+        pending = frozenset(wanted - results.keys())
+        if not pending:
+            return results
+        _availability_cache.cache.record_miss(len(pending))
+
+        async def load():
+            if get_settings().SCRAPER_SIMULATE:
+                fetched = await CourseScraperService.simulate_term_availability(pending, year, semester)
+            else:
+                fetched = await CourseScraperService.check_term_availability(pending, year, semester)
+
+            for crn, availability in fetched.items():
+                if 'error' not in availability:
+                    _availability_cache.set(CourseScraperService.availability_key(crn, year, semester), availability)
+            return fetched
+
+        term_key = (CourseScraperService.term_code(year, semester), pending)
+        fetched = await _availability_cache.flight.do(term_key, load)
+        results.update({crn: dict(availability) for crn, availability in fetched.items()})
+
+        return results
+
     @staticmethod
     async def check_course_availability(crn: str, year: int, semester: str) -> Dict[str, Any]:
         """
         Scrape university course registration system to check if a course is available.
-        
+
         This is a placeholder implementation. In a real system, you would need to:
         1. Customize this for your university's specific registration system
         2. Add appropriate error handling and rate limiting
         3. Consider implementing a cache to avoid hitting the registration system too frequently
         """
         try:
-            # This URL should be changed to your university's course registration system
-            base_url = "https://example-university.edu/courses"
-            
-            # Convert semester to the format expected by the university's system
-            semester_code = {
-                "Spring": "10",
-                "Summer": "20",
-                "Fall": "30"
-            }.get(semester, "30")
-            
+            # Point SCRAPER_BASE_URL at your university's course registration system
+            base_url = get_settings().SCRAPER_BASE_URL
+            term = CourseScraperService.term_code(year, semester)
+
             # Format the URL for the course search
-            search_url = f"{base_url}/search?term={year}{semester_code}&crn={crn}"
-            
-            # Make HTTP request to the registration system
-            async with httpx.AsyncClient() as client:
-                response = await client.get(search_url, timeout=30.0)
-                response.raise_for_status()
-                
-                # Parse the HTML response
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # This part needs to be customized for your university's HTML structure
-                # Example: Look for a certain element that indicates if the course is open
-                course_row = soup.find('tr', {'id': re.compile(f'.*{crn}.*')})
-                
-                if not course_row:
-                    logger.warning(f"Course with CRN {crn} not found")
-                    return {
-                        "is_open": False,
-                        "seats_available": 0,
-                        "error": "Course not found"
-                    }
-                
-                # Look for indicators of course availability
-                # This is just an example - adjust to match your university's website
-                status_cell = course_row.find('td', {'class': 'status'})
-                seats_cell = course_row.find('td', {'class': 'seats'})
-                
-                is_open = False
-                seats_available = 0
-                
-                if status_cell:
-                    status_text = status_cell.text.strip().lower()
-                    is_open = "open" in status_text
-                
-                if seats_cell:
-                    try:
-                        seats_available = int(seats_cell.text.strip())
-                    except ValueError:
-                        seats_available = 0
-                
+            search_url = f"{base_url}/search?term={term}&crn={crn}"
+
+            # Make HTTP request to the registration system and parse the HTML
+            # response. The parsers in services.parsers need to be customized
+            # for your university's HTML structure
+            results = await CourseScraperService.fetch_listing(search_url, [crn])
+
+            if str(crn) not in results:
+                logger.warning(f"Course with CRN {crn} not found")
                 return {
-                    "is_open": is_open,
-                    "seats_available": seats_available
+                    "is_open": False,
+                    "seats_available": 0,
+                    "error": "Course not found"
                 }
-        
+
+            return results[str(crn)]
+
+        except CircuitOpenError as e:
+            logger.warning(f"Not checking course {crn}: {e}")
+            return CourseScraperService.error_result("Upstream unavailable", upstream_unavailable=True)
+
         except httpx.TimeoutException:
             logger.error(f"Timeout while checking course {crn}")
-            return {"is_open": False, "error": "Request timeout"}
-        
+            return CourseScraperService.error_result("Request timeout", upstream_unavailable=True)
+
+        except httpx.TransportError as e:
+            logger.error(f"Connection error while checking course {crn}: {e}")
+            return CourseScraperService.error_result(f"Connection error: {e}", upstream_unavailable=True)
+
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error while checking course {crn}: {e}")
-            return {"is_open": False, "error": f"HTTP error: {e.response.status_code}"}
-            
+            return CourseScraperService.error_result(
+                f"HTTP error: {e.response.status_code}",
+                upstream_unavailable=e.response.status_code >= 500 or e.response.status_code in THROTTLE_STATUS_CODES
+            )
+
         except Exception as e:
             logger.error(f"Error checking course {crn}: {e}")
-            return {"is_open": False, "error": str(e)}
+            return CourseScraperService.error_result(str(e))
+
+    @staticmethod
+    async def check_term_availability(crns: Iterable[str], year: int, semester: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape the term listing once and return the availability of every requested CRN.
+
+        All rows are read in a single pass over the listing page, so checking a
+        whole term costs one request instead of one request per CRN.
+        """
+        wanted = {str(crn) for crn in crns}
+        if not wanted:
+            return {}
+
+        try:
+            base_url = get_settings().SCRAPER_BASE_URL
+            term = CourseScraperService.term_code(year, semester)
+            listing_url = f"{base_url}/search?term={term}"
+
+            results = await CourseScraperService.fetch_listing(listing_url, wanted)
+
+            for crn in wanted - results.keys():
+                logger.warning(f"Course with CRN {crn} not found in term {term} listing")
+                results[crn] = {
+                    "is_open": False,
+                    "seats_available": 0,
+                    "error": "Course not found"
+                }
+
+            return results
+
+        except CircuitOpenError as e:
+            logger.warning(f"Not checking term {year} {semester}: {e}")
+            result = CourseScraperService.error_result("Upstream unavailable", upstream_unavailable=True)
+
+        except httpx.TimeoutException:
+            logger.error(f"Timeout while checking term {year} {semester}")
+            result = CourseScraperService.error_result("Request timeout", upstream_unavailable=True)
+
+        except httpx.TransportError as e:
+            logger.error(f"Connection error while checking term {year} {semester}: {e}")
+            result = CourseScraperService.error_result(f"Connection error: {e}", upstream_unavailable=True)
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error while checking term {year} {semester}: {e}")
+            result = CourseScraperService.error_result(
+                f"HTTP error: {e.response.status_code}",
+                upstream_unavailable=e.response.status_code >= 500 or e.response.status_code in THROTTLE_STATUS_CODES
+            )
+
+        except Exception as e:
+            logger.error(f"Error checking term {year} {semester}: {e}")
+            result = CourseScraperService.error_result(str(e))
+
+        return {crn: dict(result) for crn in wanted}
 
     @staticmethod
     async def simulate_course_availability(crn: str, year: int, semester: str) -> Dict[str, Any]:
@@ -92,17 +363,23 @@ class CourseScraperService:
         Simulate course availability for testing without actually scraping.
         This is useful for development and testing.
         """
-        import random
-        
         # Simulate some randomness in availability
         is_open = random.random() > 0.7  # 30% chance of being open
         seats_available = 0
-        
+
         if is_open:
             seats_available = random.randint(1, 10)
-        
+
         return {
             "is_open": is_open,
             "seats_available": seats_available,
             "note": "This is simulated data for development purposes"
-        } 
\ No newline at end of file
+        }
+
+    @staticmethod
+    async def simulate_term_availability(crns: Iterable[str], year: int, semester: str) -> Dict[str, Dict[str, Any]]:
+        """Simulated counterpart of check_term_availability"""
+        return {
+            str(crn): await CourseScraperService.simulate_course_availability(crn, year, semester)
+            for crn in crns
+        }
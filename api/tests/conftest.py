@@ -0,0 +1,93 @@
+import os
+import sys
+
+import boto3
+import pytest
+
+# Settings are read once, at import; point them at moto before anything loads them
+os.environ.update(
+    AWS_REGION_NAME='us-east-1',
+    AWS_DEFAULT_REGION='us-east-1',
+    AWS_ACCESS_KEY_ID='testing',
+    AWS_SECRET_ACCESS_KEY='testing',
+    AWS_COGNITO_APP_CLIENT_ID='test-client',
+    AWS_COGNITO_USER_POOL_ID='us-east-1_test',
+    SNS_TOPIC_ARN='arn:aws:sns:us-east-1:123456789012:course-notifications'
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moto import mock_aws  # noqa: E402
+
+from repositories.aws import AWSRepository, set_aws  # noqa: E402
+
+
+@pytest.fixture
+def dynamodb():
+    """moto-backed tables shaped like lib/ddb.ts, with a fresh AWSRepository"""
+    with mock_aws():
+        resource = boto3.resource('dynamodb', region_name='us-east-1')
+        resource.create_table(
+            TableName='Course-Classes',
+            KeySchema=[{'AttributeName': 'class_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'class_id', 'AttributeType': 'S'},
+                {'AttributeName': 'semester', 'AttributeType': 'S'},
+                {'AttributeName': 'year', 'AttributeType': 'N'}
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'semester-year-index',
+                'KeySchema': [
+                    {'AttributeName': 'semester', 'KeyType': 'HASH'},
+                    {'AttributeName': 'year', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        resource.create_table(
+            TableName='Course-Users',
+            KeySchema=[{'AttributeName': 'user_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'user_id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        resource.create_table(
+            TableName='Course-UserCourses',
+            KeySchema=[
+                {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'class_id', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'user_id', 'AttributeType': 'S'},
+                {'AttributeName': 'class_id', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'class-users-index',
+                'KeySchema': [
+                    {'AttributeName': 'class_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'user_id', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        resource.create_table(
+            TableName='Course-NotificationLedger',
+            KeySchema=[{'AttributeName': 'ledger_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'ledger_id', 'AttributeType': 'S'},
+                {'AttributeName': 'delivery', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'pending-index',
+                'KeySchema': [{'AttributeName': 'delivery', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'}
+            }],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        boto3.client('sns', region_name='us-east-1').create_topic(Name='course-notifications')
+        
+        previous = set_aws(AWSRepository())
+        try:
+            yield resource
+        finally:
+            set_aws(previous)
@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from core.dependencies import get_current_user
+from core.dynamodb import encode_cursor
+from main import app
+
+# The router's own prefix is added to the one main.py mounts it under
+COURSES = '/courses/courses/'
+
+
+@pytest.fixture
+def client(dynamodb):
+    """u1 watching five classes, u2 watching one"""
+    with dynamodb.Table('Course-Classes').batch_writer() as batch:
+        for i in range(5):
+            batch.put_item(Item={
+                'class_id': f'{10000 + i}-2026-Fall',
+                'crn': str(10000 + i),
+                'year': 2026,
+                'semester': 'Fall',
+                'is_open': False
+            })
+    with dynamodb.Table('Course-UserCourses').batch_writer() as batch:
+        for i in range(5):
+            batch.put_item(Item={'user_id': 'u1', 'class_id': f'{10000 + i}-2026-Fall'})
+        batch.put_item(Item={'user_id': 'u2', 'class_id': '10000-2026-Fall'})
+    
+    app.dependency_overrides[get_current_user] = lambda: {'username': 'u1'}
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user)
+
+
+def test_pages_follow_the_cursor(client):
+    pages = []
+    cursor = None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = client.get(COURSES, params=params)
+        assert response.status_code == 200
+        pages.append([course['crn'] for course in response.json()])
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    
+    assert [crn for page in pages for crn in page] == [str(10000 + i) for i in range(5)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+@pytest.mark.parametrize('key', [
+    {'user_id': 'u2', 'class_id': '10000-2026-Fall'},
+    {'user_id': 'u1'},
+    {'user_id': 'u1', 'class_id': '10000-2026-Fall', 'extra': 'x'},
+    {'user_id': 'u1', 'class_id': 10000},
+    {'user_id': 'u1', 'class_id': {'S': '10000-2026-Fall'}}
+], ids=['other-user', 'missing-key', 'extra-key', 'number', 'nested'])
+def test_tampered_cursor_is_rejected(client, key):
+    response = client.get(COURSES, params={'limit': 2, 'cursor': encode_cursor(key)})
+    
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Invalid pagination cursor"
+
+
+def test_malformed_cursor_is_rejected(client):
+    response = client.get(COURSES, params={'cursor': 'not-a-cursor'})
+    
+    assert response.status_code == 400
@@ -0,0 +1,87 @@
+import asyncio
+
+from core import metrics
+from core.config import get_settings
+from repositories.aws import get_aws
+from services.course import CourseService
+from services.scraper import CourseScraperService
+
+
+def put_watched_classes(dynamodb, count, user_id='u1', tracked='10003'):
+    """`count` closed classes, one of them (`tracked`) watched by `user_id`"""
+    with dynamodb.Table('Course-Classes').batch_writer() as batch:
+        for i in range(count):
+            batch.put_item(Item={
+                'class_id': f'{10000 + i}-2026-Fall',
+                'crn': str(10000 + i),
+                'year': 2026,
+                'semester': 'Fall',
+                'is_open': False,
+                'seats_available': 0,
+                'watcher_count': 1
+            })
+    dynamodb.Table('Course-Users').put_item(Item={'user_id': user_id, 'email': f'{user_id}@example.edu'})
+    dynamodb.Table('Course-UserCourses').put_item(Item={'user_id': user_id, 'class_id': f'{tracked}-2026-Fall'})
+
+
+def open_crns(monkeypatch, *crns):
+    """Stub the scraper so only `crns` are open"""
+    async def get_term_availability(term_crns, year, semester):
+        return {
+            crn: {'is_open': crn in crns, 'seats_available': 5 if crn in crns else 0}
+            for crn in term_crns
+        }
+    monkeypatch.setattr(CourseScraperService, 'get_term_availability', staticmethod(get_term_availability))
+
+
+def notify():
+    async def run():
+        metrics.start_cycle()
+        return await CourseService.notify_users_for_open_courses()
+    return asyncio.run(run())
+
+
+def test_notify_reads_each_class_once(dynamodb, monkeypatch):
+    put_watched_classes(dynamodb, 40)
+    open_crns(monkeypatch, '10003')
+    
+    result = notify()
+    counters = result['metrics']['counters']
+    
+    assert result['notifications_sent'] == 1
+    # Classes come from the check cycle's scan, never read again one by one
+    assert 'dynamodb.GetItem' not in counters
+    assert counters['dynamodb.Scan'] == get_settings().CLASSES_SCAN_SEGMENTS
+    assert counters['classes_checked'] == 40
+
+
+def test_failed_send_is_retried_by_the_next_run(dynamodb, monkeypatch):
+    put_watched_classes(dynamodb, 5)
+    open_crns(monkeypatch, '10003')
+    ledger = dynamodb.Table('Course-NotificationLedger')
+    
+    def unavailable(**kwargs):
+        raise RuntimeError("SNS unavailable")
+    sns = get_aws().sns
+    monkeypatch.setattr(sns, 'publish_batch', unavailable)
+    monkeypatch.setattr(sns, 'publish', unavailable)
+    
+    result = notify()
+    assert result['notifications_sent'] == 0
+    assert len(result['notifications_failed']) == 1
+    [entry] = ledger.scan()['Items']
+    assert entry['delivery'] == 'pending'
+    assert entry['attempts'] == 1
+    
+    monkeypatch.undo()
+    open_crns(monkeypatch, '10003')
+    
+    # The class is already recorded open, so only the ledger knows about it
+    result = notify()
+    assert result['notifications_retried'] == 1
+    assert result['notifications_sent'] == 1
+    [entry] = ledger.scan()['Items']
+    assert 'delivery' not in entry
+    
+    result = notify()
+    assert result['message'] == 'No newly opened courses found'
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from services.parsers import FastListingParser, SoupListingParser, parse_listing
+
+# A 400-section listing page. Its status cells vary in quoting, class lists and
+# nested tags, some seats cells are blank, and some rows are cross-listed
+# under two CRNs
+with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'listing.html')) as f:
+    LISTING = f.read()
+
+ALL_CRNS = [str(10000 + i * 7) for i in range(400)]
+
+
+@pytest.mark.parametrize('crns', [
+    ALL_CRNS,
+    ALL_CRNS[:1],
+    ALL_CRNS[-1:],
+    ALL_CRNS[::37],
+    ['10092', '10091'],  # cross-listed row, by its second CRN and its first
+    ['99999'],  # not on the page
+])
+def test_fast_parser_matches_soup_parser(crns):
+    assert FastListingParser().parse(LISTING, crns) == SoupListingParser().parse(LISTING, crns)
+
+
+def test_listing_values():
+    results = parse_listing(LISTING, ALL_CRNS + ['10092'])
+    
+    assert len(results) == 401
+    assert results['10092'] == results['10091']
+    assert any(result['is_open'] and result['seats_available'] > 0 for result in results.values())
+    assert any(not result['is_open'] for result in results.values())
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import metrics
+from core.config import get_settings
+from repositories.aws import get_aws
+from services.course import CourseService
+from services.scraper import CourseScraperService
+
+
+@pytest.fixture
+def classes(dynamodb, monkeypatch):
+    """20 watched, closed classes whose availability never changes"""
+    table = dynamodb.Table('Course-Classes')
+    with table.batch_writer() as batch:
+        for i in range(20):
+            batch.put_item(Item={
+                'class_id': f'{10000 + i}-2026-Fall',
+                'crn': str(10000 + i),
+                'year': 2026,
+                'semester': 'Fall',
+                'is_open': False,
+                'seats_available': 0,
+                'watcher_count': 1 + i % 5
+            })
+    
+    async def get_term_availability(crns, year, semester):
+        return {crn: {'is_open': False, 'seats_available': 0} for crn in crns}
+    monkeypatch.setattr(CourseScraperService, 'get_term_availability', staticmethod(get_term_availability))
+    
+    # moto's PartiQL parser takes a single SET clause; DynamoDB takes one per
+    # attribute, which is what write_heartbeats sends
+    def single_set(params, **kwargs):
+        for statement in params.get('Statements', []):
+            statement['Statement'] = statement['Statement'].replace(' SET next_check_at', ', next_check_at')
+    get_aws().dynamodb_client.meta.events.register('provide-client-params.dynamodb.BatchExecuteStatement', single_set)
+    
+    return table
+
+
+def check_cycle():
+    async def run():
+        cycle = metrics.start_cycle()
+        await CourseService.check_all_courses()
+        return cycle.as_dict()['counters']
+    return asyncio.run(run())
+
+
+def test_scheduled_classes_are_not_read_again_until_due(classes):
+    counters = check_cycle()
+    
+    assert counters['classes_checked'] == 20
+    assert counters['heartbeat_writes'] == 20
+    assert all('next_check_at' in item for item in classes.scan()['Items'])
+    
+    # Nothing is due yet, so DynamoDB filters every class out of the scan
+    counters = check_cycle()
+    assert counters['classes_due'] == 0
+    assert 'classes_checked' not in counters
+
+
+def test_rechecks_between_heartbeats_skip_the_write(classes):
+    check_cycle()
+    
+    # Every class falls due again before its heartbeat does
+    for item in classes.scan()['Items']:
+        last_checked = datetime.fromisoformat(item['last_checked'])
+        next_check_at = datetime.fromisoformat(item['next_check_at'])
+        shift = next_check_at - datetime.now() + timedelta(seconds=1)
+        classes.update_item(
+            Key={'class_id': item['class_id']},
+            UpdateExpression="SET last_checked = :last_checked, next_check_at = :next_check_at",
+            ExpressionAttributeValues={
+                ':last_checked': (last_checked - shift).isoformat(),
+                ':next_check_at': (next_check_at - shift).isoformat()
+            }
+        )
+    
+    counters = check_cycle()
+    assert counters['classes_checked'] == 20
+    assert counters['writes_avoided'] == 20
+    assert 'dynamodb.BatchExecuteStatement' not in counters
+
+
+def test_budget_defers_the_rest(classes, monkeypatch):
+    monkeypatch.setattr(get_settings(), 'SCHEDULER_BUDGET_PER_RUN', 5)
+    
+    counters = check_cycle()
+    assert counters['classes_checked'] == 5
+    assert counters['classes_deferred'] == 15
+    
+    # Checked classes aren't due again yet; the deferred ones are next
+    counters = check_cycle()
+    assert counters['classes_due'] == 15
+    assert counters['classes_checked'] == 5
@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+import pytest
+
+import core.circuit_breaker
+import core.http_client
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.scraper import CourseScraperService
+
+HOST = 'registration.test'
+URL = f'http://{HOST}/listing'
+
+
+def test_cancelled_probe_does_not_wedge_the_circuit(monkeypatch):
+    breaker = CircuitBreaker(HOST, failure_threshold=2, recovery_timeout=0.1, success_threshold=1)
+    monkeypatch.setitem(core.circuit_breaker._breakers, HOST, breaker)
+    host = {'mode': 'failing'}
+    
+    async def handler(request):
+        if host['mode'] == 'failing':
+            return httpx.Response(500)
+        if host['mode'] == 'hanging':
+            await asyncio.sleep(10)
+        return httpx.Response(200, text='ok')
+    
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(core.http_client, '_client', client)
+        monkeypatch.setattr(core.http_client, '_client_loop', asyncio.get_running_loop())
+        
+        for _ in range(2):
+            await CourseScraperService.request(URL)
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            await CourseScraperService.request(URL)
+        
+        # The probe after the recovery timeout is cancelled by a check timeout
+        await asyncio.sleep(0.15)
+        host['mode'] = 'hanging'
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(CourseScraperService.request(URL), 0.1)
+        assert breaker.state == CircuitBreaker.OPEN
+        
+        # Its slot was given back, so the next probe goes through and closes the circuit
+        host['mode'] = 'recovered'
+        await asyncio.sleep(0.15)
+        response = await CourseScraperService.request(URL)
+        assert response.status_code == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+        
+        await client.aclose()
+    
+    asyncio.run(run())
@@ -0,0 +1,32 @@
+import asyncio
+import json
+
+from repositories.aws import get_aws
+from services.notification import NotificationService
+
+
+def filter_policies(sns, topic_arn):
+    return {
+        subscription['Endpoint']: json.loads(
+            sns.get_subscription_attributes(SubscriptionArn=subscription['SubscriptionArn'])['Attributes'].get('FilterPolicy', 'null')
+        )
+        for subscription in sns.list_subscriptions_by_topic(TopicArn=topic_arn)['Subscriptions']
+    }
+
+
+def test_migration_silences_unmatched_subscriptions(dynamodb):
+    aws = get_aws()
+    sns, topic_arn = aws.sns, aws.sns_topic_arn
+    # Broadcast subscriptions from before per-user filter policies
+    sns.subscribe(TopicArn=topic_arn, Protocol='email', Endpoint='known@example.edu')
+    sns.subscribe(TopicArn=topic_arn, Protocol='email', Endpoint='stranger@example.edu')
+    dynamodb.Table('Course-Users').put_item(Item={'user_id': 'u1', 'email': 'known@example.edu'})
+    
+    result = asyncio.run(NotificationService.migrate_subscriptions())
+    
+    assert result['migrated'] == 1
+    assert len(result['unmatched']) == 1
+    assert filter_policies(sns, topic_arn) == {
+        'known@example.edu': {'user_id': ['u1']},
+        'stranger@example.edu': {'user_id': [{'exists': False}]}
+    }
@@ -0,0 +1,60 @@
+import asyncio
+
+from services.course import CourseService
+from schemas.course import CourseCreate
+
+
+def put_legacy_class(dynamodb, crn, watchers):
+    """A class and mappings written before watcher counts existed; returns its class_id"""
+    course = CourseCreate(crn=crn, year=2026, semester='Fall')
+    class_id = CourseService.create_course_id(course.crn, course.year, course.semester)
+    dynamodb.Table('Course-Classes').put_item(Item={
+        'class_id': class_id,
+        'crn': crn,
+        'year': 2026,
+        'semester': 'Fall',
+        'is_open': False,
+        'seats_available': 0
+    })
+    for user_id in watchers:
+        dynamodb.Table('Course-UserCourses').put_item(Item={'user_id': user_id, 'class_id': class_id})
+    return class_id
+
+
+def watcher_count(dynamodb, class_id):
+    return dynamodb.Table('Course-Classes').get_item(Key={'class_id': class_id})['Item'].get('watcher_count')
+
+
+def scanned_class_ids():
+    async def scan():
+        return [course['class_id'] async for page in CourseService.scan_classes() for course in page]
+    return asyncio.run(scan())
+
+
+def test_removing_a_legacy_watcher_keeps_the_others(dynamodb):
+    class_id = put_legacy_class(dynamodb, '10001', ['u1', 'u2', 'u3'])
+    
+    asyncio.run(CourseService.remove_course('u1', class_id))
+    
+    assert watcher_count(dynamodb, class_id) == 2
+    assert scanned_class_ids() == [class_id]
+
+
+def test_new_watcher_leaving_a_legacy_class_keeps_the_others(dynamodb):
+    class_id = put_legacy_class(dynamodb, '10002', ['u1', 'u2'])
+    
+    asyncio.run(CourseService.add_course('u3', CourseCreate(crn='10002', year=2026, semester='Fall')))
+    assert watcher_count(dynamodb, class_id) == 3
+    
+    asyncio.run(CourseService.remove_course('u3', class_id))
+    assert watcher_count(dynamodb, class_id) == 2
+    assert scanned_class_ids() == [class_id]
+
+
+def test_last_watcher_leaving_drops_the_class(dynamodb):
+    class_id = put_legacy_class(dynamodb, '10003', ['u1'])
+    
+    asyncio.run(CourseService.remove_course('u1', class_id))
+    
+    assert watcher_count(dynamodb, class_id) == 0
+    assert scanned_class_ids() == []
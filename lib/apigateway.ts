@@ -12,6 +12,7 @@ export interface ApiGatewayConstructProps {
     classesTableName: string;
     usersTableName: string;
     userCoursesTableName: string;
+    notificationLedgerTableName: string;
     snsTopicArn: string;
 }
 
@@ -39,19 +40,23 @@ export class ApiGatewayConstruct extends Construct {
         lambdaRole.addToPolicy(new iam.PolicyStatement({
             actions: [
                 'dynamodb:GetItem',
+                'dynamodb:BatchGetItem',
                 'dynamodb:PutItem',
                 'dynamodb:UpdateItem',
                 'dynamodb:DeleteItem',
                 'dynamodb:Query',
-                'dynamodb:Scan'
+                'dynamodb:Scan',
+                'dynamodb:PartiQLUpdate'
             ],
             resources: [
                 `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.classesTableName}`,
                 `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.usersTableName}`,
                 `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.userCoursesTableName}`,
+                `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.notificationLedgerTableName}`,
                 `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.classesTableName}/index/*`,
                 `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.usersTableName}/index/*`,
-                `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.userCoursesTableName}/index/*`
+                `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.userCoursesTableName}/index/*`,
+                `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.notificationLedgerTableName}/index/*`
             ]
         }));
         
@@ -62,6 +67,8 @@ export class ApiGatewayConstruct extends Construct {
                 'cognito-idp:AdminCreateUser',
                 'cognito-idp:AdminSetUserPassword',
                 'cognito-idp:AdminGetUser',
+                'cognito-idp:ListUsers',
+                'cognito-idp:DescribeUserPool',
                 'cognito-idp:AdminUpdateUserAttributes',
                 'cognito-idp:AdminConfirmSignUp',
                 'cognito-idp:ForgotPassword',
@@ -85,9 +92,14 @@ export class ApiGatewayConstruct extends Construct {
         lambdaRole.addToPolicy(new iam.PolicyStatement({
             actions: [
                 'sns:Publish',
-                'sns:Subscribe'
+                'sns:Subscribe',
+                'sns:Unsubscribe',
+                'sns:ListSubscriptionsByTopic',
+                'sns:GetSubscriptionAttributes',
+                'sns:SetSubscriptionAttributes'
             ],
-            resources: [props.snsTopicArn]
+            // Subscription ARNs are the topic ARN followed by a subscription id
+            resources: [props.snsTopicArn, `${props.snsTopicArn}:*`]
         }));
         
         // Create the Lambda function using the Docker image
@@ -102,6 +114,7 @@ export class ApiGatewayConstruct extends Construct {
                 CLASSES_TABLE_NAME: props.classesTableName,
                 USERS_TABLE_NAME: props.usersTableName,
                 USER_COURSES_TABLE_NAME: props.userCoursesTableName,
+                NOTIFICATION_LEDGER_TABLE_NAME: props.notificationLedgerTableName,
                 SNS_TOPIC_ARN: props.snsTopicArn
             },
             role: lambdaRole,
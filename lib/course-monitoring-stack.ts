@@ -42,6 +42,7 @@ export class CourseMonitoringStack extends cdk.Stack {
             classesTableName: dynamoDb.classes.tableName,
             usersTableName: dynamoDb.users.tableName,
             userCoursesTableName: dynamoDb.userCourses.tableName,
+            notificationLedgerTableName: dynamoDb.notificationLedger.tableName,
             snsTopicArn: sns.courseNotificationTopic.topicArn
         });
         
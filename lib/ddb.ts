@@ -5,6 +5,7 @@ export class DynamoDBConstruct extends Construct {
     public readonly users: dynamodb.Table;  
     public readonly classes: dynamodb.Table;
     public readonly userCourses: dynamodb.Table;
+    public readonly notificationLedger: dynamodb.Table;
 
     constructor(scope: Construct, id: string) {
         super(scope, id);
@@ -27,6 +28,8 @@ export class DynamoDBConstruct extends Construct {
                 type: dynamodb.AttributeType.STRING,
             },
             billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            // Classes from closed terms are removed once expires_at passes
+            timeToLiveAttribute: 'expires_at',
         });
         
         // Add GSI for fast queries on semester, year
@@ -54,6 +57,8 @@ export class DynamoDBConstruct extends Construct {
                 type: dynamodb.AttributeType.STRING,
             },
             billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            // Mappings expire with their class, so none outlives it
+            timeToLiveAttribute: 'expires_at',
         });
         
         // Add GSI for querying by class_id
@@ -68,5 +73,25 @@ export class DynamoDBConstruct extends Construct {
                 type: dynamodb.AttributeType.STRING,
             },
         });
+        
+        // Ledger of sent notifications so each opening is notified at most once
+        this.notificationLedger = new dynamodb.Table(this, 'NotificationLedgerTable', {
+            tableName: 'Course-NotificationLedger',
+            partitionKey: {
+                name: 'ledger_id',
+                type: dynamodb.AttributeType.STRING,
+            },
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            timeToLiveAttribute: 'expires_at',
+        });
+        
+        // Sparse GSI of notifications that failed to send, for later runs to retry
+        this.notificationLedger.addGlobalSecondaryIndex({
+            indexName: 'pending-index',
+            partitionKey: {
+                name: 'delivery',
+                type: dynamodb.AttributeType.STRING,
+            },
+        });
     }
 }